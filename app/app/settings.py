@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/2.1/ref/settings/
 """
 
+import importlib.util
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -27,6 +29,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['0.0.0.0']
 
+# Whether the test suite is running
+TESTING = sys.argv[1:2] == ['test']
+
 
 # Application definition
 
@@ -37,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'core',
@@ -45,7 +51,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.WarmUpMiddleware',
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -78,13 +87,92 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
+# Connections are kept open for DB_CONN_MAX_AGE seconds between requests,
+# or until the end of each request if 0. With DB_POOL set, closed
+# connections are instead returned to a pool of up to DB_POOL_MAX_SIZE per
+# worker process, shared by its threads.
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'core.db.backends.postgresql_pool'
+            if os.environ.get('DB_POOL')
+            else 'django.db.backends.postgresql'
+        ),
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
-        'PASSWORD': os.environ.get('DB_PASS')
+        'PASSWORD': os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            # Connections opened in advance by core.warmup
+            'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            # Seconds to wait for a free connection
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            # Seconds a connection may be idle before being checked again
+            'CHECK_INTERVAL': float(
+                os.environ.get('DB_POOL_CHECK_INTERVAL', 30)
+            ),
+        },
+    }
+}
+
+# With DB_WARM_UP set, each server process primes its caches and pool
+# connections with core.warmup before handling its first request. This is
+# done after the process starts serving, not when the application loads,
+# so workers forked from a preloading server such as gunicorn --preload
+# open their own connections rather than inheriting the parent's.
+
+DATABASE_WARM_UP = bool(os.environ.get('DB_WARM_UP'))
+
+# Read replicas
+# Reads made while handling GET, HEAD and OPTIONS requests go to one of the
+# replicas listed in DB_REPLICA_HOSTS, which otherwise share the primary's
+# settings. Clients which wrote in the last PIN['SECONDS'] read from the
+# primary, so they see their own writes while replicas catch up; this
+# should exceed the replicas' usual lag.
+
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+
+DATABASE_REPLICAS = []
+
+for index, host in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))
+):
+    DATABASES[f'replica_{index}'] = dict(
+        DATABASES['default'],
+        HOST=host,
+        TEST={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+if TESTING and not DATABASE_REPLICAS:
+    # A second connection to the test database, which the router's tests
+    # route reads to in place of a replica
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        TEST={'MIRROR': 'default'}
+    )
+
+DATABASE_REPLICA_PIN = {
+    'SECONDS': float(os.environ.get('DB_REPLICA_PIN_SECONDS', 5)),
+    'CACHE_ALIAS': 'default',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+# The local memory cache is per process, so deployments running several
+# workers should point CACHE_BACKEND/CACHE_LOCATION at a shared cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
@@ -108,6 +196,36 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/2.1/topics/auth/passwords/
+# The first of PASSWORD_HASHERS hashes new passwords, and hashes made by
+# the others are upgraded to it when their user next logs in. Argon2, or
+# else bcrypt, is preferred when its library is installed, as it costs far
+# less CPU per login than PBKDF2. PASSWORD_HASHERS may also be set to a
+# comma separated list.
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+for library, hasher in (
+    ('bcrypt', 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher'),
+    ('argon2', 'django.contrib.auth.hashers.Argon2PasswordHasher'),
+):
+    if importlib.util.find_spec(library):
+        PASSWORD_HASHERS.remove(hasher)
+        PASSWORD_HASHERS.insert(0, hasher)
+
+if os.environ.get('PASSWORD_HASHERS'):
+    PASSWORD_HASHERS = os.environ['PASSWORD_HASHERS'].split(',')
+
+# Tests only need passwords to be checked, not to be costly to crack
+if TESTING:
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.1/topics/i18n/
 
@@ -133,3 +251,114 @@ MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
 AUTH_USER_MODEL = 'core.user'
+
+# Django REST framework
+# The JSON renderer and parser use orjson when it is installed, and the
+# stdlib json module otherwise
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Requests per client IP to the endpoints which hash passwords
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.environ.get('LOGIN_THROTTLE_RATE', '10/min'),
+        'signup': os.environ.get('SIGNUP_THROTTLE_RATE', '10/hour'),
+    },
+    # Proxies in front of the app, whose X-Forwarded-For entries identify
+    # clients; with none, the header could be forged to evade throttling
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+}
+
+# Request metrics
+# Each request's timings are sent in a Server-Timing header, unless
+# METRICS_SERVER_TIMING=0, and aggregated per process at /metrics for
+# Prometheus, which must send "Authorization: Bearer <METRICS_TOKEN>".
+# Without METRICS_TOKEN, /metrics is not served
+
+METRICS = {
+    'SERVER_TIMING': bool(int(os.environ.get('METRICS_SERVER_TIMING', 1))),
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+}
+
+# Token authentication cache
+# Tokens are cached in process and, if CACHE_ALIAS names one of CACHES,
+# in that shared cache too. The shared cache also tells every process when
+# a token is deleted or its user changes. Without one, other processes
+# keep authenticating a revoked token until their copy expires, so TTL
+# then defaults to 5 seconds rather than 60.
+
+TOKEN_AUTH_CACHE_ALIAS = os.environ.get('TOKEN_AUTH_CACHE_ALIAS')
+
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 1024)),
+    'TTL': int(os.environ.get(
+        'TOKEN_AUTH_CACHE_TTL',
+        60 if TOKEN_AUTH_CACHE_ALIAS else 5
+    )),
+    'CACHE_ALIAS': TOKEN_AUTH_CACHE_ALIAS,
+}
+
+# Recipe API pagination
+# Clients may request up to RECIPE_MAX_PAGE_SIZE items with ?page_size=
+
+RECIPE_PAGE_SIZE = int(os.environ.get('RECIPE_PAGE_SIZE', 100))
+
+RECIPE_MAX_PAGE_SIZE = int(os.environ.get('RECIPE_MAX_PAGE_SIZE', 1000))
+
+# Recipe image processing
+# Uploaded images are re-encoded and resized to fit each of
+# RECIPE_IMAGE_SIZES by a pool of RECIPE_IMAGE_WORKERS background threads
+
+RECIPE_IMAGE_SIZES = [
+    int(size) for size in
+    os.environ.get('RECIPE_IMAGE_SIZES', '128,512,1024').split(',')
+]
+
+RECIPE_IMAGE_WORKERS = int(os.environ.get('RECIPE_IMAGE_WORKERS', 2))
+
+# Largest image upload accepted, in bytes; uploads are streamed to a
+# temporary file under MEDIA_ROOT and moved into place once complete
+
+RECIPE_IMAGE_MAX_BYTES = int(
+    os.environ.get('RECIPE_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+)
+
+# Maximum number of items in one bulk create, update or delete request
+
+RECIPE_BULK_MAX_ITEMS = int(os.environ.get('RECIPE_BULK_MAX_ITEMS', 5000))
+
+# Tag and ingredient autocomplete
+# Up to LIMIT matches are returned by default and at most MAX_LIMIT with
+# ?limit=; recent results are cached in process per user
+
+RECIPE_AUTOCOMPLETE = {
+    'LIMIT': int(os.environ.get('RECIPE_AUTOCOMPLETE_LIMIT', 10)),
+    'MAX_LIMIT': int(os.environ.get('RECIPE_AUTOCOMPLETE_MAX_LIMIT', 50)),
+    'CACHE_SIZE': int(os.environ.get('RECIPE_AUTOCOMPLETE_CACHE_SIZE', 4096)),
+    'CACHE_TTL': int(os.environ.get('RECIPE_AUTOCOMPLETE_CACHE_TTL', 60)),
+}
+
+# Recipe API response cache
+
+RECIPE_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': int(os.environ.get('RECIPE_CACHE_TIMEOUT', 300)),
+}
+
+# Number of changed objects returned by each request to the sync feed
+
+RECIPE_SYNC_BATCH_SIZE = int(os.environ.get('RECIPE_SYNC_BATCH_SIZE', 500))
+
+# Number of recipes read from the database, or inserted, at a time by the
+# streaming export and import
+
+RECIPE_TRANSFER_BATCH_SIZE = int(
+    os.environ.get('RECIPE_TRANSFER_BATCH_SIZE', 1000)
+)
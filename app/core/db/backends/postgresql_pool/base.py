@@ -0,0 +1,48 @@
+from django.db.backends.postgresql import base, creation
+
+from core.db.pool import close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Pooled connections to the test database would block dropping it
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend which returns closed connections to a pool shared
+    by the threads of the process, configured by the POOL database setting
+    """
+    creation_class = DatabaseCreation
+
+    def _get_pool(self):
+        options = self.settings_dict.get('POOL', {})
+        params = self.get_connection_params()
+        return get_pool(
+            tuple(sorted(params.items())),
+            max_size=options.get('MAX_SIZE', 10),
+            timeout=options.get('TIMEOUT', 10),
+            check_interval=options.get('CHECK_INTERVAL', 30)
+        )
+
+    def get_new_connection(self, conn_params):
+        self.pool = self._get_pool()
+        connection = self.pool.acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+        )
+        # Set when a connection is first opened, and kept while pooled
+        self.isolation_level = connection.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self.errors_occurred and not self.is_usable():
+            self.pool.discard(self.connection)
+        else:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
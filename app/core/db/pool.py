@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, \
+    TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_INTRANS
+
+
+class ConnectionPool:
+    """Thread safe pool of up to max_size open psycopg2 connections
+
+    Connections idle for longer than check_interval seconds are checked
+    with a query before being handed out again. Callers wait up to timeout
+    seconds for a connection once every one is in use.
+    """
+
+    def __init__(self, max_size=10, timeout=10, check_interval=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def acquire(self, connect):
+        """Return an idle connection, or a new one opened with connect()"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise psycopg2.OperationalError(
+                f'No database connection free after {self.timeout}s, '
+                f'all {self.max_size} are in use'
+            )
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    # The most recently used is the least likely to be stale
+                    connection, released = self._idle.pop()
+                if self._is_usable(connection, released):
+                    return connection
+                self._close(connection)
+            return connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection):
+        """Return a connection to the pool, ending any open transaction"""
+        if connection.closed:
+            return self.discard(connection)
+        status = connection.get_transaction_status()
+        if status in (TRANSACTION_STATUS_INTRANS, TRANSACTION_STATUS_INERROR):
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                return self.discard(connection)
+        elif status != TRANSACTION_STATUS_IDLE:
+            # Broken or mid-query
+            return self.discard(connection)
+
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+        self._slots.release()
+
+    def discard(self, connection):
+        """Close a connection instead of returning it to the pool"""
+        self._close(connection)
+        self._slots.release()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def _is_usable(self, connection, released):
+        if connection.closed:
+            return False
+        if time.monotonic() - released < self.check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, **options):
+    """Return the process wide pool for key and options"""
+    key = (key, tuple(sorted(options.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(**options)
+        return _pools[key]
+
+
+def close_pools():
+    """Close the idle connections of every pool"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
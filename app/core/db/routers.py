@@ -0,0 +1,79 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_local = threading.local()
+
+# Read from the primary even by requests routed to a replica: tokens are
+# cached by user.authentication anyway, and a token or session created
+# moments ago must authenticate the next request before replicas have it
+PRIMARY_MODELS = {'authtoken.token', 'sessions.session'}
+
+
+class RoutingState:
+    """How the reads of the request being handled are routed"""
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+
+
+@contextmanager
+def read_from_replica():
+    """Route reads in the current thread to a replica, chosen once so they
+    all see the same state, until the first write
+    """
+    previous = getattr(_local, 'state', None)
+    replicas = settings.DATABASE_REPLICAS
+    state = RoutingState(random.choice(replicas) if replicas else None)
+    _local.state = state
+    try:
+        yield state
+    finally:
+        _local.state = previous
+
+
+def read_alias():
+    """Return the database the current thread reads from"""
+    state = getattr(_local, 'state', None)
+    if state is None or state.replica is None or state.wrote:
+        return DEFAULT_DB_ALIAS
+    # Reads inside a transaction must see the writes made in it
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return state.replica
+
+
+class ReplicaRouter:
+    """Send reads to a replica while core.middleware routes the request to
+    one, and everything else to the primary
+    """
+
+    def db_for_read(self, model, **hints):
+        if 'instance' in hints:
+            # Related objects come from the database of the instance
+            return None
+        if model._meta.label_lower in PRIMARY_MODELS:
+            return DEFAULT_DB_ALIAS
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = getattr(_local, 'state', None)
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold copies of the primary's rows
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -1,22 +1,45 @@
 import time
 
-from django.db import connections
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.utils import OperationalError
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+# Seconds to wait after the first failed attempt, doubling up to the max
+INITIAL_DELAY = 0.5
+MAX_DELAY = 5
 
 
 class Command(BaseCommand):
     """Django command to pause execution until db ready"""
 
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Seconds to wait before giving up.'
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.WARNING("Waiting for database..."))
-        db_conn = None
-        while not db_conn:
+        connection = connections[options['database']]
+        deadline = time.monotonic() + options['timeout']
+        delay = INITIAL_DELAY
+        while True:
             try:
-                db_conn = connections['default']
-            except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second")
-                time.sleep(1)
+                connection.ensure_connection()
+                break
+            except OperationalError as error:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(f'Database unavailable: {error}')
+                delay = min(delay, remaining)
+                self.stdout.write(
+                    f'Database unavailable, waiting {delay:g} seconds'
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_DELAY)
 
         self.stdout.write(self.style.SUCCESS('Database available'))
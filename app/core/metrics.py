@@ -0,0 +1,210 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n'
+    )
+
+
+def _format_labels(names, values):
+    labels = ','.join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return f'{{{labels}}}' if labels else ''
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Thread safe Prometheus counter, by label values"""
+    type = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values):
+        """Count one more for label_values"""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + 1
+
+    def samples(self):
+        """Yield the (name, label names, label values, value) samples"""
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield self.name, self.labels, label_values, value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Thread safe Prometheus histogram, by label values, counting the
+    observations no greater than each of its buckets' upper bounds
+    """
+    type = 'histogram'
+
+    def __init__(self, name, documentation, buckets, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = sorted(buckets)
+        self.labels = labels
+        # Per label values, the count in each bucket and above the last,
+        # then the sum of the observations
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """Record an observation of value for label_values"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(label_values)
+            if values is None:
+                values = [0] * (len(self.buckets) + 2)
+                self._values[label_values] = values
+            values[index] += 1
+            values[-1] += value
+
+    def samples(self):
+        """Yield the (name, label names, label values, value) samples, with
+        cumulative bucket counts
+        """
+        with self._lock:
+            values = sorted(
+                (label_values, list(counts))
+                for label_values, counts in self._values.items()
+            )
+        labels = self.labels + ('le',)
+        for label_values, counts in values:
+            count = 0
+            for bound, bucket_count in zip(
+                self.buckets + ['+Inf'], counts
+            ):
+                count += bucket_count
+                yield (
+                    f'{self.name}_bucket',
+                    labels,
+                    label_values + (_format_value(bound),),
+                    count
+                )
+            yield f'{self.name}_sum', self.labels, label_values, counts[-1]
+            yield f'{self.name}_count', self.labels, label_values, count
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+def render(metrics):
+    """Return metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in metrics:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for name, labels, label_values, value in metric.samples():
+            lines.append(
+                f'{name}{_format_labels(labels, label_values)} '
+                f'{_format_value(value)}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+_local = threading.local()
+
+
+def set_request_timings(timings):
+    """Set the timings of the request the current thread is handling,
+    or None once it is handled
+    """
+    _local.timings = timings
+
+
+@contextmanager
+def timing_serialization():
+    """Add the time spent in the block to the serialization time of the
+    request being handled, counting nested blocks once
+    """
+    timings = getattr(_local, 'timings', None)
+    if timings is None or timings.serializing:
+        yield
+        return
+    timings.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialize_duration += time.perf_counter() - started
+        timings.serializing = False
+
+
+# Seconds and sizes up to which the request metrics are counted
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304
+)
+
+REQUESTS = Counter(
+    'http_requests_total',
+    'Requests handled, by view and action and response status',
+    labels=('view', 'status')
+)
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Wall time spent handling requests',
+    DURATION_BUCKETS,
+    labels=('view',)
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Database queries run per request',
+    QUERY_BUCKETS,
+    labels=('view',)
+)
+DB_DURATION = Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent in database queries per request',
+    DURATION_BUCKETS,
+    labels=('view',)
+)
+SERIALIZE_DURATION = Histogram(
+    'http_request_serialize_duration_seconds',
+    'Time spent representing objects as response data',
+    DURATION_BUCKETS,
+    labels=('view',)
+)
+RENDER_DURATION = Histogram(
+    'http_request_render_duration_seconds',
+    'Time spent encoding response data into response bodies',
+    DURATION_BUCKETS,
+    labels=('view',)
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes',
+    'Size of response bodies, except streamed ones',
+    SIZE_BUCKETS,
+    labels=('view',)
+)
+
+REQUEST_METRICS = (
+    REQUESTS,
+    REQUEST_DURATION,
+    DB_QUERIES,
+    DB_DURATION,
+    SERIALIZE_DURATION,
+    RENDER_DURATION,
+    RESPONSE_SIZE,
+)
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core import metrics
+from core.db.routers import read_from_replica
+from core.warmup import warm_up
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _pin_cache():
+    return caches[settings.DATABASE_REPLICA_PIN['CACHE_ALIAS']]
+
+
+def _pin_key(request):
+    """Return the cache key pinning the client making a request to the
+    primary, or None for anonymous clients
+
+    Clients are told apart by their credentials, as the user is only known
+    once the view has authenticated them, after its first queries.
+    """
+    credentials = (
+        request.META.get('HTTP_AUTHORIZATION') or
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credentials:
+        return None
+    return 'replica-pin:' + hashlib.sha256(credentials.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    """Route the reads of safe requests to a read replica, unless the
+    client wrote recently enough that replicas may not have its writes yet
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        key = _pin_key(request)
+        if request.method not in SAFE_METHODS or (
+            key is not None and _pin_cache().get(key)
+        ):
+            response = self.get_response(request)
+            wrote = request.method not in SAFE_METHODS
+        else:
+            with read_from_replica() as state:
+                response = self.get_response(request)
+            wrote = state.wrote
+
+        if wrote and key is not None:
+            _pin_cache().set(
+                key, True, settings.DATABASE_REPLICA_PIN['SECONDS']
+            )
+        return response
+
+
+class WarmUpMiddleware:
+    """Warm up each server process with core.warmup.warm_up() before it
+    handles its first request, if DATABASE_WARM_UP is set
+
+    Processes are told apart by pid, so workers forked after the
+    application loaded warm up their own connections.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_WARM_UP:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self._warmed_pid = None
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        if self._warmed_pid != os.getpid():
+            with self._lock:
+                if self._warmed_pid != os.getpid():
+                    warm_up()
+                    self._warmed_pid = os.getpid()
+        return self.get_response(request)
+
+
+class RequestMetrics:
+    """Timings of the request being handled"""
+
+    def __init__(self):
+        self.view = 'unresolved'
+        self.db_queries = 0
+        self.db_duration = 0
+        self.serialize_duration = 0
+        self.serializing = False
+        self.render_duration = 0
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper timing a database query"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_duration += time.perf_counter() - started
+
+    def start_render(self):
+        self._render_started = time.perf_counter()
+
+    def end_render(self, response):
+        self.render_duration = time.perf_counter() - self._render_started
+
+
+def view_name(view_func, method):
+    """Return the view and action a request is dispatched to, such as
+    RecipeViewSet.list, or the view and method for plain views
+    """
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    actions = getattr(view_func, 'actions', None) or {}
+    return f'{cls.__name__}.{actions.get(method, method)}'
+
+
+class MetricsMiddleware:
+    """Record the wall time, database queries and their time, time spent
+    serializing objects, rendering time and response size of each request,
+    by view and action
+
+    They are reported in a Server-Timing header, unless
+    METRICS['SERVER_TIMING'] is off, and aggregated per process in the
+    histograms of core.metrics, served by core.views.metrics. The body of
+    a streamed response is produced after this returns, so its queries are
+    not counted. Serialization is timed where views and serializers use
+    core.metrics.timing_serialization(), and rendering is the encoding of
+    the serialized data into the response body.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        request.metrics = RequestMetrics()
+        metrics.set_request_timings(request.metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(request.metrics)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.set_request_timings(None)
+        duration = time.perf_counter() - started
+
+        self.record(request.metrics, response, duration)
+        if settings.METRICS['SERVER_TIMING']:
+            response['Server-Timing'] = self.server_timing(
+                request.metrics,
+                duration
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics.view = view_name(view_func, request.method.lower())
+
+    def process_template_response(self, request, response):
+        # Rendering follows, once every middleware has seen the response
+        request.metrics.start_render()
+        response.add_post_render_callback(request.metrics.end_render)
+        return response
+
+    def record(self, request_metrics, response, duration):
+        view = request_metrics.view
+        metrics.REQUESTS.inc(view, response.status_code)
+        metrics.REQUEST_DURATION.observe(duration, view)
+        metrics.DB_QUERIES.observe(request_metrics.db_queries, view)
+        metrics.DB_DURATION.observe(request_metrics.db_duration, view)
+        metrics.SERIALIZE_DURATION.observe(
+            request_metrics.serialize_duration,
+            view
+        )
+        metrics.RENDER_DURATION.observe(
+            request_metrics.render_duration,
+            view
+        )
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe(len(response.content), view)
+
+    def server_timing(self, request_metrics, duration):
+        return ', '.join((
+            f'db;dur={request_metrics.db_duration * 1000:.1f};'
+            f'desc="{request_metrics.db_queries} queries"',
+            f'serialize;dur={request_metrics.serialize_duration * 1000:.1f}',
+            f'render;dur={request_metrics.render_duration * 1000:.1f}',
+            f'total;dur={duration * 1000:.1f}',
+        ))
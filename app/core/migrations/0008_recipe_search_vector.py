@@ -0,0 +1,46 @@
+# Generated by Django 2.1.15 on 2026-10-18 04:46
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='core_recipe_search__c01407_gin'),
+        ),
+        # Build the vectors of existing recipes, as recipe.search does
+        migrations.RunSQL(
+            """
+            UPDATE core_recipe r SET search_vector =
+            setweight(to_tsvector('english'::regconfig, r.title), 'A') ||
+            setweight(to_tsvector('english'::regconfig,
+                COALESCE((
+                    SELECT string_agg(t.name, ' ')
+                    FROM core_tag t
+                    JOIN core_recipe_tags rt ON rt.tag_id = t.id
+                    WHERE rt.recipe_id = r.id
+                ), '') || ' ' ||
+                COALESCE((
+                    SELECT string_agg(i.name, ' ')
+                    FROM core_ingredient i
+                    JOIN core_recipe_ingredients ri ON ri.ingredient_id = i.id
+                    WHERE ri.recipe_id = r.id
+                ), '')
+            ), 'B')
+            """,
+            migrations.RunSQL.noop
+        ),
+    ]
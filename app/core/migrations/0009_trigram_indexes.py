@@ -0,0 +1,39 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def trigram_index_sql(table, expression, name):
+    return migrations.RunSQL(
+        f'CREATE INDEX {name} ON {table} USING gin ({expression} '
+        f'gin_trgm_ops)',
+        f'DROP INDEX {name}',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_recipe_search_vector'),
+    ]
+
+    # Autocomplete matches names by prefix, which Django runs as
+    # UPPER(name::text) LIKE UPPER('prefix%'), and by trigram similarity
+    operations = [
+        TrigramExtension(),
+        trigram_index_sql('core_tag', 'name', 'core_tag_name_trgm'),
+        trigram_index_sql(
+            'core_tag',
+            '(UPPER(name::text))',
+            'core_tag_name_upper_trgm'
+        ),
+        trigram_index_sql(
+            'core_ingredient',
+            'name',
+            'core_ingredient_name_trgm'
+        ),
+        trigram_index_sql(
+            'core_ingredient',
+            '(UPPER(name::text))',
+            'core_ingredient_name_upper_trgm'
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 2.1.15 on 2026-10-18 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_recipe_time_price_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        # Count the recipes already using each tag and ingredient
+        migrations.RunSQL(
+            """
+            UPDATE core_tag t SET recipe_count = (
+                SELECT count(*) FROM core_recipe_tags rt
+                WHERE rt.tag_id = t.id
+            )
+            """,
+            migrations.RunSQL.noop
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE core_ingredient i SET recipe_count = (
+                SELECT count(*) FROM core_recipe_ingredients ri
+                WHERE ri.ingredient_id = i.id
+            )
+            """,
+            migrations.RunSQL.noop
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 2.1.15 on 2026-10-18 05:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=20)),
+                ('object_id', models.IntegerField()),
+                ('txid', models.BigIntegerField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.User')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['user', 'txid', 'id'], name='core_change_user_id_43f06b_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='change',
+            unique_together={('model', 'object_id')},
+        ),
+        # Existing objects are sent to sync clients as changed
+        migrations.RunSQL(
+            """
+            INSERT INTO core_change (user_id, model, object_id, txid)
+            SELECT user_id, 'recipe', id, txid_current() FROM core_recipe
+            UNION ALL
+            SELECT user_id, 'tag', id, txid_current() FROM core_tag
+            UNION ALL
+            SELECT user_id, 'ingredient', id, txid_current()
+            FROM core_ingredient
+            """,
+            migrations.RunSQL.noop
+        ),
+    ]
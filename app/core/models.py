@@ -2,6 +2,9 @@ import uuid
 import os
 
 from django.db import models
+from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
     PermissionsMixin
 
@@ -56,6 +59,18 @@ class Tag(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    # Number of recipes using this, maintained by recipe.signals
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Tags are always listed per user, ordered by name
+            models.Index(fields=['user', 'name']),
+            # Sync clients fetch what changed since their last request
+            models.Index(fields=['user', 'updated']),
+        ]
 
     def __str__(self):
         return self.name
@@ -68,6 +83,18 @@ class Ingredient(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
+    # Number of recipes using this, maintained by recipe.signals
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Ingredients are always listed per user, ordered by name
+            models.Index(fields=['user', 'name']),
+            # Sync clients fetch what changed since their last request
+            models.Index(fields=['user', 'updated']),
+        ]
 
     def __str__(self):
         return self.name
@@ -85,6 +112,49 @@ class Recipe(models.Model):
     ingredients = models.ManyToManyField('Ingredient')
     tags = models.ManyToManyField('Tag')
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    # Resized copies of image by size and format, e.g.
+    # {'512': {'jpg': 'uploads/recipe/<uuid>_512.jpg', 'webp': ...}}
+    image_variants = JSONField(default=dict, blank=True)
+    # Title, tag and ingredient names, maintained by recipe.signals
+    search_vector = SearchVectorField(null=True, editable=False)
+    created = models.DateTimeField(auto_now_add=True)
+    # Also set when the recipe's tags or ingredients change, see
+    # recipe.signals
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Recipes are listed per user, paginated by id
+            models.Index(fields=['user', 'id']),
+            # Recipes can be filtered and ordered by time and price
+            models.Index(fields=['user', 'time_minutes', 'id']),
+            models.Index(fields=['user', 'price', 'id']),
+            models.Index(fields=['user', 'updated']),
+            GinIndex(fields=['search_vector']),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class Change(models.Model):
+    """Latest change to a recipe, tag or ingredient, read by sync clients
+
+    Each object has a single row, recording the transaction which last
+    created, changed or deleted it; see recipe.changes.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    # Model name of the object, e.g. 'recipe'
+    model = models.CharField(max_length=20)
+    object_id = models.IntegerField()
+    txid = models.BigIntegerField()
+
+    class Meta:
+        unique_together = (('model', 'object_id'),)
+        indexes = [
+            # Changes are read per user in transaction order
+            models.Index(fields=['user', 'txid', 'id']),
+        ]
@@ -0,0 +1,85 @@
+import csv
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from core.renderers import CSVRenderer, FastJSONRenderer, \
+    NDJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """JSON parser using orjson when it is installed, which like the
+    stdlib parser rejects NaN and Infinity
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        data = stream.read()
+        try:
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class StreamingParser(BaseParser):
+    """Parser for lists of flat objects which can also parse them one at a
+    time with parse_rows(), so large bodies are never held in memory
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return list(self.parse_rows(stream, media_type, parser_context))
+
+    def parse_rows(self, stream, media_type=None, parser_context=None):
+        """Yield the objects read line by line from stream"""
+        raise NotImplementedError('parse_rows() must be implemented.')
+
+    def _encoding(self, parser_context):
+        parser_context = parser_context or {}
+        return parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+    def _decoded_lines(self, stream, parser_context):
+        encoding = self._encoding(parser_context)
+        for line in stream or ():
+            yield line.decode(encoding)
+
+
+class NDJSONParser(StreamingParser):
+    """Parser for newline delimited JSON, skipping blank lines"""
+    media_type = 'application/x-ndjson'
+    renderer_class = NDJSONRenderer
+
+    def parse_rows(self, stream, media_type=None, parser_context=None):
+        loads = orjson.loads if orjson is not None else json.loads
+        encoding = self._encoding(parser_context)
+        for number, line in enumerate(stream or (), 1):
+            if not line.strip():
+                continue
+            try:
+                # Invalid bytes raise UnicodeDecodeError, a ValueError
+                yield loads(line.decode(encoding))
+            except ValueError as exc:
+                raise ParseError(f'JSON parse error on line {number} - {exc}')
+
+
+class CSVParser(StreamingParser):
+    """Parser for CSV with a header row naming the fields of each object"""
+    media_type = 'text/csv'
+    renderer_class = CSVRenderer
+
+    def parse_rows(self, stream, media_type=None, parser_context=None):
+        reader = csv.DictReader(self._decoded_lines(stream, parser_context))
+        try:
+            yield from reader
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ParseError(
+                f'CSV parse error on line {reader.line_num} - {exc}'
+            )
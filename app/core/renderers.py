@@ -0,0 +1,102 @@
+import csv
+import io
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+else:
+    # Datetimes go through the encoder, which formats UTC as 'Z'
+    DUMPS_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer using orjson when it is installed
+
+    Output matches JSONRenderer's: compact UTF-8 with U+2028 and U+2029
+    escaped. Types orjson does not handle natively, such as Decimal, lazy
+    strings and datetimes, are converted by the stdlib renderer's encoder.
+    Indented output, and data orjson cannot encode, fall back to the stdlib
+    renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=DUMPS_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028')
+            ret = ret.replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class StreamingRenderer(BaseRenderer):
+    """Renderer for lists of flat objects which can also render them one at
+    a time with render_rows(), for StreamingHttpResponse
+
+    Anything other than a list, such as an error, is rendered as a list of
+    one object.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows else []
+        return b''.join(self.render_rows(rows, fields))
+
+    def render_rows(self, rows, fields):
+        """Yield the rendering of an iterable of objects, limited to and
+        ordered by fields, in chunks
+        """
+        raise NotImplementedError('render_rows() must be implemented.')
+
+
+class NDJSONRenderer(StreamingRenderer):
+    """Renderer for newline delimited JSON, one object per line"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render_rows(self, rows, fields):
+        json = FastJSONRenderer()
+        for row in rows:
+            yield json.render({name: row[name] for name in fields}) + b'\n'
+
+
+class CSVRenderer(StreamingRenderer):
+    """Renderer for CSV with a header row, which joins lists of values
+    with semicolons
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render_rows(self, rows, fields):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([
+                ';'.join(map(str, row[name]))
+                if isinstance(row[name], list) else row[name]
+                for name in fields
+            ])
+            yield buffer.getvalue().encode(self.charset)
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # The header of an empty list
+            yield buffer.getvalue().encode(self.charset)
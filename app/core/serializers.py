@@ -0,0 +1,11 @@
+from core.metrics import timing_serialization
+
+
+class TimedSerializerMixin:
+    """Serializer mixin adding the time spent representing objects to the
+    serialization time of the request's metrics
+    """
+
+    def to_representation(self, instance):
+        with timing_serialization():
+            return super().to_representation(instance)
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.cache import LRUCache
+
+
+class LRUCacheTests(SimpleTestCase):
+
+    def test_get_and_set(self):
+        """Test values can be cached and retrieved"""
+        cache = LRUCache()
+        cache.set('key', 'value')
+
+        self.assertEqual(cache.get('key'), 'value')
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual(cache.get('missing', 'default'), 'default')
+
+    def test_least_recently_used_evicted(self):
+        """Test the least recently used entry is evicted once full"""
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+    @patch('core.cache.time.monotonic')
+    def test_entries_expire(self, monotonic):
+        """Test entries expire after the ttl"""
+        monotonic.return_value = 100
+        cache = LRUCache(ttl=10)
+        cache.set('key', 'value')
+
+        monotonic.return_value = 109
+        self.assertEqual(cache.get('key'), 'value')
+        monotonic.return_value = 110
+        self.assertIsNone(cache.get('key'))
+
+    def test_delete(self):
+        """Test entries can be deleted"""
+        cache = LRUCache()
+        cache.set('key', 'value')
+        cache.delete('key')
+        cache.delete('missing')
+
+        self.assertIsNone(cache.get('key'))
@@ -1,21 +1,107 @@
+from io import StringIO
 from unittest.mock import patch
 
-from django.core.management import call_command
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import TestCase
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, \
+    override_settings
+
+from core.middleware import WarmUpMiddleware
+from core.models import Recipe
+from core.warmup import plan, warm_up, warm_up_querysets
+
+ENSURE_CONNECTION = 'django.db.backends.base.base.' \
+    'BaseDatabaseWrapper.ensure_connection'
 
 
 class CommandTests(TestCase):
 
     def test_wait_for_db_ready(self):
         """Test waiting for db when db is available"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+        with patch(ENSURE_CONNECTION) as ec:
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ec.call_count, 1)
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
-        """Test waiting for db"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
+        """Test waiting for db, backing off exponentially"""
+        with patch(ENSURE_CONNECTION) as ec:
+            ec.side_effect = [OperationalError] * 5 + [None]
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ec.call_count, 6)
+
+        self.assertEqual(
+            [call[0][0] for call in ts.call_args_list],
+            [0.5, 1, 2, 4, 5]
+        )
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_timeout(self, ts):
+        """Test waiting for db gives up after the timeout"""
+        with patch(ENSURE_CONNECTION) as ec, \
+                patch('time.monotonic', side_effect=[0, 1, 2, 3]):
+            ec.side_effect = OperationalError('refused')
+            with self.assertRaisesMessage(CommandError, 'refused'):
+                call_command('wait_for_db', timeout=2.5, stdout=StringIO())
+
+        self.assertEqual(ec.call_count, 3)
+        # The last wait is cut short by the timeout
+        self.assertEqual(
+            [call[0][0] for call in ts.call_args_list],
+            [0.5, 0.5]
+        )
+
+    def test_warm_up(self):
+        """Test warming up primes the ContentType cache"""
+        ContentType.objects.clear_cache()
+        # Content types created in the test's transaction must not outlive it
+        self.addCleanup(ContentType.objects.clear_cache)
+
+        self.assertEqual(warm_up(), 1)
+        with self.assertNumQueries(0):
+            ContentType.objects.get_for_model(Recipe)
+
+    def test_warm_up_querysets_planned(self):
+        """Test the hot querysets are planned without being run"""
+        querysets = warm_up_querysets()
+
+        with self.assertNumQueries(len(querysets)) as context:
+            plan(connection, querysets)
+
+        self.assertTrue(querysets)
+        for query in context.captured_queries:
+            self.assertTrue(query['sql'].startswith('EXPLAIN SELECT'))
+
+
+class WarmUpMiddlewareTests(SimpleTestCase):
+
+    def get_response(self, request):
+        return HttpResponse()
+
+    @override_settings(DATABASE_WARM_UP=False)
+    def test_warm_up_disabled(self):
+        """Test the middleware is not used unless warm up is enabled"""
+        with self.assertRaises(MiddlewareNotUsed):
+            WarmUpMiddleware(self.get_response)
+
+    @override_settings(DATABASE_WARM_UP=True)
+    @patch('core.middleware.warm_up')
+    def test_warm_up_per_process(self, warm_up):
+        """Test each process warms up before its first request, including
+        processes forked after the middleware was loaded
+        """
+        middleware = WarmUpMiddleware(self.get_response)
+        request = RequestFactory().get('/')
+        warm_up.assert_not_called()
+
+        with patch('os.getpid', return_value=1):
+            middleware(request)
+            middleware(request)
+        with patch('os.getpid', return_value=2):
+            middleware(request)
+
+        self.assertEqual(warm_up.call_count, 2)
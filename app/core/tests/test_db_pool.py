@@ -0,0 +1,118 @@
+import psycopg2
+
+from django.db import OperationalError, connection
+from django.test import TestCase
+
+from core.db.backends.postgresql_pool.base import DatabaseWrapper
+from core.db.pool import ConnectionPool, close_pools
+
+
+class ConnectionPoolTests(TestCase):
+    """Test the pool of open database connections"""
+
+    def setUp(self):
+        self.pool = ConnectionPool(max_size=2, timeout=0, check_interval=0)
+        self.addCleanup(self.pool.close)
+
+    def connect(self):
+        conn = psycopg2.connect(**connection.get_connection_params())
+        self.addCleanup(conn.close)
+        return conn
+
+    def test_released_connection_reused(self):
+        """Test a released connection is handed out again"""
+        conn = self.pool.acquire(self.connect)
+        self.pool.release(conn)
+
+        self.assertIs(self.pool.acquire(self.connect), conn)
+
+    def test_exhausted(self):
+        """Test acquiring fails once every connection is in use"""
+        self.pool.acquire(self.connect)
+        self.pool.acquire(self.connect)
+
+        with self.assertRaises(psycopg2.OperationalError):
+            self.pool.acquire(self.connect)
+
+    def test_open_transaction_rolled_back(self):
+        """Test releasing a connection ends its transaction"""
+        conn = self.pool.acquire(self.connect)
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        self.pool.release(conn)
+
+        self.assertEqual(
+            conn.get_transaction_status(),
+            psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        )
+
+    def test_closed_connection_replaced(self):
+        """Test connections closed while pooled are not handed out"""
+        conn = self.pool.acquire(self.connect)
+        self.pool.release(conn)
+        conn.close()
+
+        self.assertIsNot(self.pool.acquire(self.connect), conn)
+
+    def test_terminated_connection_replaced(self):
+        """Test idle connections the server dropped fail their check"""
+        conn = self.pool.acquire(self.connect)
+        self.pool.release(conn)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_terminate_backend(%s)',
+                [conn.get_backend_pid()]
+            )
+
+        new_conn = self.pool.acquire(self.connect)
+
+        self.assertIsNot(new_conn, conn)
+        self.assertTrue(conn.closed)
+
+    def test_discarded_connection_frees_slot(self):
+        """Test discarding a connection lets another be opened"""
+        conn = self.pool.acquire(self.connect)
+        self.pool.acquire(self.connect)
+        self.pool.discard(conn)
+
+        self.assertIsNot(self.pool.acquire(self.connect), conn)
+
+
+class PooledBackendTests(TestCase):
+    """Test the pooled PostgreSQL backend"""
+
+    def setUp(self):
+        self.addCleanup(close_pools)
+
+    def wrapper(self, **pool):
+        settings_dict = dict(connection.settings_dict, POOL=pool)
+        # Separate from the test's connection, under the same alias
+        wrapper = DatabaseWrapper(settings_dict)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_closed_connection_returned_to_pool(self):
+        """Test closing a connection keeps it open for the next one"""
+        first = self.wrapper()
+        first.ensure_connection()
+        conn = first.connection
+        first.close()
+
+        second = self.wrapper()
+        second.ensure_connection()
+
+        self.assertIs(second.connection, conn)
+        self.assertFalse(conn.closed)
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+
+    def test_pool_exhausted(self):
+        """Test connecting fails with a database error when the pool has
+        no free connections
+        """
+        self.wrapper(MAX_SIZE=1, TIMEOUT=0).ensure_connection()
+
+        with self.assertRaises(OperationalError):
+            self.wrapper(MAX_SIZE=1, TIMEOUT=0).ensure_connection()
@@ -0,0 +1,156 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.db.routers import ReplicaRouter, read_alias, read_from_replica
+from core.models import Tag
+from user.authentication import token_cache
+
+TAGS_URL = reverse('recipe:tag-list')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Test reads are routed to the replica, which in tests is a second
+    connection to the test database
+
+    Reads inside a transaction go to the primary, so these tests cannot
+    run inside one.
+    """
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user)}'
+        )
+
+    def request(self, method, *args, **kwargs):
+        """Make a request, returning the queries run on each database"""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            res = getattr(self.client, method)(*args, **kwargs)
+        self.assertLess(res.status_code, 400)
+        return len(primary), len(replica)
+
+    def test_read_from_replica(self):
+        """Test the reads of a GET request go to the replica, apart from
+        the token lookup
+        """
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        primary, replica = self.request('get', TAGS_URL)
+
+        self.assertEqual(primary, 1)
+        self.assertGreater(replica, 0)
+
+    def test_write_to_primary(self):
+        """Test POST requests only use the primary"""
+        primary, replica = self.request('post', TAGS_URL, {'name': 'Vegan'})
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_read_own_writes_from_primary(self):
+        """Test a client which just wrote reads from the primary"""
+        self.request('post', TAGS_URL, {'name': 'Vegan'})
+
+        primary, replica = self.request('get', TAGS_URL)
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_other_clients_read_from_replica(self):
+        """Test a write only pins the client which made it"""
+        self.request('post', TAGS_URL, {'name': 'Vegan'})
+        other_user = get_user_model().objects.create_user(
+            'other@email.com',
+            'Password1'
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=other_user)}'
+        )
+
+        primary, replica = self.request('get', TAGS_URL)
+
+        self.assertGreater(replica, 0)
+
+    def test_replica_reads_not_cached_after_write(self):
+        """Test responses read from the replica soon after a write are not
+        cached, so the pinned client which wrote never gets them
+        """
+        self.request('post', TAGS_URL, {'name': 'Vegan'})
+        other_client = APIClient()
+        other_client.force_authenticate(user=self.user)
+        other_client.get(TAGS_URL)
+
+        primary, replica = self.request('get', TAGS_URL)
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    @override_settings(DATABASE_REPLICA_PIN={
+        'SECONDS': 0,
+        'CACHE_ALIAS': 'default',
+    })
+    def test_replica_reads_cached(self):
+        """Test responses read from the replica are cached once replicas
+        have caught up with the user's writes
+        """
+        self.request('post', TAGS_URL, {'name': 'Vegan'})
+        self.request('get', TAGS_URL)
+
+        primary, replica = self.request('get', TAGS_URL)
+
+        self.assertEqual((primary, replica), (0, 0))
+
+    @override_settings(DATABASE_REPLICA_PIN={
+        'SECONDS': 0,
+        'CACHE_ALIAS': 'default',
+    })
+    def test_pin_expires(self):
+        """Test clients read from the replica again once their pin expires"""
+        self.request('post', TAGS_URL, {'name': 'Vegan'})
+
+        primary, replica = self.request('get', TAGS_URL)
+
+        self.assertGreater(replica, 0)
+
+    def test_read_after_write_from_primary(self):
+        """Test reads later in a request which wrote go to the primary"""
+        with read_from_replica():
+            self.assertEqual(read_alias(), 'replica')
+            Tag.objects.create(user=self.user, name='Vegan')
+
+            self.assertEqual(read_alias(), 'default')
+
+    def test_read_in_transaction_from_primary(self):
+        """Test reads inside a transaction go to the primary"""
+        with read_from_replica(), transaction.atomic():
+            self.assertEqual(read_alias(), 'default')
+
+    def test_read_outside_request_from_primary(self):
+        """Test reads outside requests, such as in commands, go to the
+        primary
+        """
+        self.assertEqual(read_alias(), 'default')
+
+    def test_relation_across_databases_allowed(self):
+        """Test objects read from the replica can be related to ones from
+        the primary
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        replica_tag = Tag.objects.using('replica').get(id=tag.id)
+
+        self.assertTrue(ReplicaRouter().allow_relation(tag, replica_tag))
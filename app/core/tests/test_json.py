@@ -0,0 +1,101 @@
+import datetime
+import io
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
+
+import pytz
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+
+SAMPLE_DATA = {
+    'results': [
+        OrderedDict((
+            ('id', 1),
+            ('title', 'Crêpes "au sucre"'),
+            ('price', Decimal('5.50')),
+            ('tags', [1, 2]),
+            ('link', 'line\u2028separator'),
+        )),
+    ],
+    'created': datetime.datetime(2019, 1, 2, 3, 4, 5, tzinfo=pytz.utc),
+    'date': datetime.date(2019, 1, 2),
+    'key': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'message': gettext_lazy('Not found.'),
+    1: None,
+    'next': None,
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Test rendering JSON with the fast renderer"""
+
+    @skipIf(orjson is None, 'orjson is not installed')
+    def test_output_matches_stdlib_renderer(self):
+        """Test orjson output is identical to the stdlib renderer's"""
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE_DATA),
+            JSONRenderer().render(SAMPLE_DATA)
+        )
+
+    def test_fallback_without_orjson(self):
+        """Test the stdlib renderer is used when orjson is missing"""
+        with patch('core.renderers.orjson', None):
+            ret = FastJSONRenderer().render(SAMPLE_DATA)
+
+        self.assertEqual(ret, JSONRenderer().render(SAMPLE_DATA))
+
+    def test_indented_output(self):
+        """Test indented output is still supported"""
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE_DATA, media_type),
+            JSONRenderer().render(SAMPLE_DATA, media_type)
+        )
+
+    def test_none_rendered_empty(self):
+        """Test no data renders as an empty body"""
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class FastJSONParserTests(SimpleTestCase):
+    """Test parsing JSON with the fast parser"""
+
+    def parse(self, body, encoding='utf-8'):
+        return FastJSONParser().parse(
+            io.BytesIO(body),
+            parser_context={'encoding': encoding}
+        )
+
+    def test_parse(self):
+        """Test parsing a JSON body"""
+        data = self.parse('{"title": "Crêpes", "tags": [1]}'.encode())
+
+        self.assertEqual(data, {'title': 'Crêpes', 'tags': [1]})
+
+    def test_parse_other_encoding(self):
+        """Test bodies in other encodings are decoded first"""
+        data = self.parse('["Crêpes"]'.encode('latin-1'), 'latin-1')
+
+        self.assertEqual(data, ['Crêpes'])
+
+    def test_invalid_json(self):
+        """Test invalid JSON and non-finite numbers are rejected"""
+        for body in (b'{"title": ', b'[NaN]', b'[Infinity]'):
+            with self.assertRaises(ParseError):
+                self.parse(body)
+
+    def test_fallback_without_orjson(self):
+        """Test the stdlib parser is used when orjson is missing"""
+        with patch('core.parsers.orjson', None):
+            self.assertEqual(self.parse(b'{"id": 1}'), {'id': 1})
+            with self.assertRaises(ParseError):
+                self.parse(b'[NaN]')
@@ -0,0 +1,200 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.models import Tag
+
+METRICS_URL = reverse('metrics')
+TAGS_URL = reverse('recipe:tag-list')
+TOKEN_URL = reverse('user:token')
+ME_URL = reverse('user:me')
+
+
+class MetricTests(SimpleTestCase):
+
+    def test_counter(self):
+        """Test counters are rendered per label values"""
+        counter = metrics.Counter('requests_total', 'Requests', ('view',))
+        counter.inc('a')
+        counter.inc('a')
+        counter.inc('b"')
+
+        self.assertEqual(metrics.render([counter]), (
+            '# HELP requests_total Requests\n'
+            '# TYPE requests_total counter\n'
+            'requests_total{view="a"} 2\n'
+            'requests_total{view="b\\""} 1\n'
+        ))
+
+    def test_histogram(self):
+        """Test histograms are rendered with cumulative buckets"""
+        histogram = metrics.Histogram('queries', 'Queries', (1, 5))
+        histogram.observe(1)
+        histogram.observe(3)
+        histogram.observe(8)
+
+        self.assertEqual(metrics.render([histogram]), (
+            '# HELP queries Queries\n'
+            '# TYPE queries histogram\n'
+            'queries_bucket{le="1"} 1\n'
+            'queries_bucket{le="5"} 2\n'
+            'queries_bucket{le="+Inf"} 3\n'
+            'queries_sum 12\n'
+            'queries_count 3\n'
+        ))
+
+
+class MetricsMiddlewareTests(TestCase):
+    """Test requests are timed by view and action"""
+
+    def setUp(self):
+        for metric in metrics.REQUEST_METRICS:
+            metric.clear()
+            self.addCleanup(metric.clear)
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def samples(self, metric):
+        return {
+            (name, label_values): value
+            for name, _, label_values, value in metric.samples()
+        }
+
+    def test_request_recorded(self):
+        """Test a request's queries, time and size are recorded under its
+        view and action
+        """
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TAGS_URL)
+
+        view = ('TagViewSet.list',)
+        self.assertEqual(
+            self.samples(metrics.REQUESTS),
+            {('http_requests_total', ('TagViewSet.list', 200)): 1}
+        )
+        db_queries = self.samples(metrics.DB_QUERIES)
+        self.assertEqual(
+            db_queries['http_request_db_queries_sum', view],
+            len(queries)
+        )
+        self.assertEqual(
+            self.samples(metrics.RESPONSE_SIZE)[
+                'http_response_size_bytes_sum', view
+            ],
+            len(res.content)
+        )
+        self.assertGreater(
+            self.samples(metrics.SERIALIZE_DURATION)[
+                'http_request_serialize_duration_seconds_sum', view
+            ],
+            0
+        )
+        self.assertGreater(
+            self.samples(metrics.RENDER_DURATION)[
+                'http_request_render_duration_seconds_sum', view
+            ],
+            0
+        )
+
+    def test_serializer_timed(self):
+        """Test the time serializers spend representing objects is
+        recorded
+        """
+        self.client.get(ME_URL)
+
+        self.assertGreater(
+            self.samples(metrics.SERIALIZE_DURATION)[
+                'http_request_serialize_duration_seconds_sum',
+                ('ManageUserView.get',)
+            ],
+            0
+        )
+
+    def test_serialization_outside_request(self):
+        """Test serializing outside a request records nothing"""
+        with metrics.timing_serialization():
+            pass
+
+        self.assertEqual(self.samples(metrics.SERIALIZE_DURATION), {})
+
+    def test_server_timing(self):
+        """Test responses report their timings"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TAGS_URL)
+
+        timings = dict(
+            timing.split(';', 1)[0:2]
+            for timing in res['Server-Timing'].split(', ')
+        )
+        self.assertEqual(
+            set(timings),
+            {'db', 'serialize', 'render', 'total'}
+        )
+        self.assertIn(f'desc="{len(queries)} queries"', timings['db'])
+
+    @override_settings(METRICS={'SERVER_TIMING': False, 'TOKEN': None})
+    def test_server_timing_disabled(self):
+        """Test the Server-Timing header can be turned off"""
+        res = self.client.get(TAGS_URL)
+
+        self.assertNotIn('Server-Timing', res)
+
+    def test_view_names(self):
+        """Test views which are not view sets are recorded by method, and
+        unresolved requests together
+        """
+        self.client.post(TOKEN_URL, {})
+        self.client.get('/missing/')
+
+        self.assertEqual(self.samples(metrics.REQUESTS), {
+            ('http_requests_total', ('CreateTokenView.post', 400)): 1,
+            ('http_requests_total', ('unresolved', 404)): 1,
+        })
+
+    @override_settings(METRICS={'SERVER_TIMING': True, 'TOKEN': 'secret'})
+    def test_metrics_endpoint(self):
+        """Test the metrics are served in the Prometheus text format"""
+        self.client.get(TAGS_URL)
+
+        res = self.client.get(
+            METRICS_URL,
+            HTTP_AUTHORIZATION='Bearer secret'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            'http_request_db_queries_count{view="TagViewSet.list"} 1\n',
+            res.content.decode()
+        )
+
+    @override_settings(METRICS={'SERVER_TIMING': True, 'TOKEN': 'secret'})
+    def test_metrics_endpoint_token(self):
+        """Test the metrics require the token when one is set"""
+        forbidden = self.client.get(METRICS_URL)
+        res = self.client.get(
+            METRICS_URL,
+            HTTP_AUTHORIZATION='Bearer secret'
+        )
+
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS={'SERVER_TIMING': True, 'TOKEN': None})
+    def test_metrics_endpoint_without_token(self):
+        """Test the metrics are not served when no token is set"""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
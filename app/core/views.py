@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from core import metrics as request_metrics
+
+
+@require_GET
+def metrics(request):
+    """Serve the request metrics of this process in the Prometheus text
+    format, to scrapers sending the METRICS['TOKEN'] bearer token
+
+    The metrics are not served at all without a token, as they reveal the
+    traffic and latency of every route.
+    """
+    token = settings.METRICS['TOKEN']
+    if not token:
+        raise Http404
+    if not constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        f'Bearer {token}'
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        request_metrics.render(request_metrics.REQUEST_METRICS),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,60 @@
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import EmptyResultSet
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.db.backends.postgresql_pool.base import \
+    DatabaseWrapper as PooledDatabaseWrapper
+
+
+def warm_up_querysets():
+    """Return the querysets apps list from a warm_up_querysets() method on
+    their AppConfig
+    """
+    return [
+        queryset
+        for app_config in apps.get_app_configs()
+        if hasattr(app_config, 'warm_up_querysets')
+        for queryset in app_config.warm_up_querysets()
+    ]
+
+
+def plan(connection, querysets):
+    """Plan querysets on a connection without running them, which loads
+    the catalog entries and statistics of the tables and indexes they use
+    into the connection's caches
+    """
+    with connection.cursor() as cursor:
+        for queryset in querysets:
+            try:
+                sql, params = queryset.query.sql_with_params()
+            except EmptyResultSet:
+                continue
+            cursor.execute(f'EXPLAIN {sql}', params)
+
+
+def warm_up(using=DEFAULT_DB_ALIAS):
+    """Prime the caches of the current process, so the first requests it
+    serves are as fast as later ones: the ContentType cache, and the
+    current connection or, with the pooled backend, POOL['MIN_SIZE'] open
+    connections with the hot queries already planned. Returns the number
+    of connections warmed up.
+    """
+    ContentType.objects.get_for_models(*apps.get_models())
+
+    connection = connections[using]
+    querysets = warm_up_querysets()
+    if not isinstance(connection, PooledDatabaseWrapper):
+        plan(connection, querysets)
+        return 1
+
+    size = connection.settings_dict.get('POOL', {}).get('MIN_SIZE', 1)
+    # Held open together, so each is a separate pooled connection
+    wrappers = [connection.copy() for _ in range(size)]
+    try:
+        for wrapper in wrappers:
+            plan(wrapper, querysets)
+    finally:
+        for wrapper in wrappers:
+            wrapper.close()
+    return size
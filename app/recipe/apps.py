@@ -3,3 +3,25 @@ from django.apps import AppConfig
 
 class RecipeConfig(AppConfig):
     name = 'recipe'
+
+    def ready(self):
+        from recipe import signals  # noqa: F401
+
+    def warm_up_querysets(self):
+        """Return querysets like those of the busiest endpoints, planned on
+        new connections by core.warmup
+        """
+        from core.models import Tag, Ingredient, Recipe
+        from recipe.rows import recipe_rows
+
+        recipes = Recipe.objects.filter(user_id=0)
+        return [
+            recipe_rows(recipes.order_by('-id'))[:100],
+            recipes.order_by('-id')[:100],
+            Tag.objects.filter(user_id=0).order_by('-name').values(
+                'id', 'name', 'recipe_count'
+            )[:100],
+            Ingredient.objects.filter(user_id=0).order_by('-name').values(
+                'id', 'name', 'recipe_count'
+            )[:100],
+        ]
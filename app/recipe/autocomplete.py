@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import BooleanField, Case, Q, Value, When
+
+from core.cache import LRUCache
+
+autocomplete_cache = LRUCache(
+    max_size=settings.RECIPE_AUTOCOMPLETE['CACHE_SIZE'],
+    ttl=settings.RECIPE_AUTOCOMPLETE['CACHE_TTL']
+)
+
+
+def autocomplete(queryset, text, limit):
+    """Return up to limit objects from queryset whose names start with or
+    resemble text, prefix matches first and then by similarity
+    """
+    starts_with = Q(name__istartswith=text)
+    return queryset.filter(
+        starts_with | Q(name__trigram_similar=text)
+    ).annotate(
+        is_prefix=Case(
+            When(starts_with, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField()
+        ),
+        similarity=TrigramSimilarity('name', text)
+    ).order_by('-is_prefix', '-similarity', 'name', 'id')[:limit]
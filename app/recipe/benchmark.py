@@ -0,0 +1,130 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.models import Tag, Ingredient, Recipe
+from recipe.counters import update_recipe_counts
+from recipe.search import update_search_vectors
+
+# Seeding in SQL keeps setup fast enough for a realistically sized dataset.
+# Recipe n is linked to tag/ingredient n and to one of ten popular ones.
+SEED_SQL = (
+    """
+    INSERT INTO core_tag (user_id, name, recipe_count, created, updated)
+    SELECT u.id, 'Tag ' || i, 0, now(), now()
+    FROM core_user u, generate_series(1, %(rows)s) i
+    WHERE u.id = ANY(%(users)s)
+    """,
+    """
+    INSERT INTO core_ingredient
+    (user_id, name, recipe_count, created, updated)
+    SELECT u.id, 'Ingredient ' || i, 0, now(), now()
+    FROM core_user u, generate_series(1, %(rows)s) i
+    WHERE u.id = ANY(%(users)s)
+    """,
+    """
+    INSERT INTO core_recipe
+    (user_id, title, time_minutes, price, link, image_variants, created,
+    updated)
+    SELECT u.id, 'Recipe ' || i, i %% 180, i %% 100, '', '{}', now(), now()
+    FROM core_user u, generate_series(1, %(rows)s) i
+    WHERE u.id = ANY(%(users)s)
+    """,
+    """
+    INSERT INTO core_recipe_tags (recipe_id, tag_id)
+    SELECT r.id, t.id
+    FROM core_recipe r
+    JOIN core_tag t
+    ON t.user_id = r.user_id AND substr(t.name, 5) = substr(r.title, 8)
+    WHERE r.user_id = ANY(%(users)s)
+    """,
+    """
+    INSERT INTO core_recipe_tags (recipe_id, tag_id)
+    SELECT r.id, t.id
+    FROM core_recipe r
+    JOIN core_tag t ON t.user_id = r.user_id
+    AND t.name = 'Tag ' || (substr(r.title, 8)::int %% 10 + 1)
+    WHERE r.user_id = ANY(%(users)s)
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO core_recipe_ingredients (recipe_id, ingredient_id)
+    SELECT r.id, i.id
+    FROM core_recipe r
+    JOIN core_ingredient i
+    ON i.user_id = r.user_id AND substr(i.name, 12) = substr(r.title, 8)
+    WHERE r.user_id = ANY(%(users)s)
+    """,
+    """
+    INSERT INTO core_recipe_ingredients (recipe_id, ingredient_id)
+    SELECT r.id, i.id
+    FROM core_recipe r
+    JOIN core_ingredient i ON i.user_id = r.user_id
+    AND i.name = 'Ingredient ' || (substr(r.title, 8)::int %% 10 + 1)
+    WHERE r.user_id = ANY(%(users)s)
+    ON CONFLICT DO NOTHING
+    """,
+)
+
+SEEDED_TABLES = (
+    'core_tag',
+    'core_ingredient',
+    'core_recipe',
+    'core_recipe_tags',
+    'core_recipe_ingredients',
+)
+
+
+def seed(users=100, rows_per_user=1000):
+    """Create users with large collections of linked recipes, tags and
+    ingredients and return the users
+    """
+    prefix = uuid.uuid4().hex[:8]
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(
+            email=f'benchmark-{prefix}-{i}@example.com',
+            name=f'Benchmark {i}'
+        )
+        for i in range(users)
+    )
+    params = {'rows': rows_per_user, 'users': [user.id for user in users]}
+    with connection.cursor() as cursor:
+        for sql in SEED_SQL:
+            cursor.execute(sql, params)
+        # Run any deferred foreign key checks now rather than at commit
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+        for table in SEEDED_TABLES:
+            cursor.execute(f'ANALYZE {table}')
+        # Built once the statistics let the link subqueries use indexes
+        update_search_vectors(Recipe.objects.filter(user__in=users))
+        update_recipe_counts(Tag.objects.filter(user__in=users))
+        update_recipe_counts(Ingredient.objects.filter(user__in=users))
+        for table in ('core_recipe', 'core_tag', 'core_ingredient'):
+            cursor.execute(f'ANALYZE {table}')
+
+    return users
+
+
+def view_queryset(viewset_class, user, params=None, action='list'):
+    """Return the queryset a viewset builds for a GET request"""
+    request = Request(APIRequestFactory().get('/', params))
+    request.user = user
+    view = viewset_class(request=request, action=action, format_kwarg=None)
+    return view.get_queryset()
+
+
+def timeit(func, repeat=20):
+    """Call func repeatedly and return the median duration in seconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    return statistics.median(durations)
@@ -0,0 +1,130 @@
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core.models import Recipe
+from recipe.caching import bump_version
+from recipe.changes import record_changes
+from recipe.counters import RECIPE_FIELDS, linked_ids, update_recipe_counts
+from recipe.search import update_search_vectors
+from recipe.signals import bulk_deletion, touch_recipes
+
+
+def delete_objects(model, ids):
+    """Delete recipes, tags or ingredients by id, maintaining recipe
+    counts, the change log and the search vectors and timestamps of linked
+    recipes with a fixed number of queries, rather than a few for each
+    object
+    """
+    if model is Recipe:
+        linked = {
+            related: linked_ids(related, ids) for related in RECIPE_FIELDS
+        }
+    else:
+        recipe_ids = list(Recipe.objects.filter(**{
+            f'{RECIPE_FIELDS[model]}__in': ids
+        }).order_by().values_list('pk', flat=True).distinct())
+
+    objects = model.objects.filter(pk__in=ids)
+    # Recorded while the rows exist, the entries become the tombstones of
+    # the deleted objects
+    record_changes(objects)
+    with bulk_deletion():
+        objects.delete()
+
+    if model is Recipe:
+        for related, related_ids in linked.items():
+            update_recipe_counts(related.objects.filter(pk__in=related_ids))
+    else:
+        update_search_vectors(Recipe.objects.filter(pk__in=recipe_ids))
+        touch_recipes(recipe_ids)
+
+
+class BulkModelMixin:
+    """Create, update and delete lists of objects in a single request
+
+    POST a list of objects to create them, PATCH a list of objects with
+    their ids to update them, or DELETE a list of ids. Each request runs in
+    one transaction and either fully succeeds or changes nothing; errors
+    are reported per item, in the order the items were sent.
+    """
+
+    def _get_items(self, request):
+        """Return the list of items in the request body"""
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({'non_field_errors': ['Expected a list.']})
+        if len(items) > settings.RECIPE_BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                f'Ensure there are no more than '
+                f'{settings.RECIPE_BULK_MAX_ITEMS} items.'
+            ]})
+        return items
+
+    def _get_instances(self, ids):
+        """Return the user's objects for ids, in the same order, or report
+        the ids which do not exist
+        """
+        instances = self.get_queryset().in_bulk(ids)
+        missing = [pk for pk in ids if pk not in instances]
+        if missing:
+            raise ValidationError({'id': [
+                f'Invalid pk "{pk}" - object does not exist.'
+                for pk in missing
+            ]})
+        return [instances[pk] for pk in ids]
+
+    def _get_ids(self, items):
+        """Return the integer ids of items, which must all be given"""
+        try:
+            return [int(item['id']) for item in items]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError({'id': ['Every item needs a valid id.']})
+
+    @action(methods=['POST'], detail=False, url_path='bulk', url_name='bulk')
+    def bulk_create(self, request):
+        """Create a list of objects"""
+        serializer = self.get_serializer(
+            data=self._get_items(request),
+            many=True
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+        # Bulk inserts do not send model signals
+        bump_version(request.user.pk)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Update a list of objects, identified by their ids"""
+        items = self._get_items(request)
+        serializer = self.get_serializer(
+            self._get_instances(self._get_ids(items)),
+            data=items,
+            many=True,
+            partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        bump_version(request.user.pk)
+        return Response(serializer.data)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        """Delete a list of objects, identified by their ids"""
+        items = self._get_items(request)
+        try:
+            ids = [int(pk) for pk in items]
+        except (TypeError, ValueError):
+            raise ValidationError({'id': ['Every item must be an id.']})
+        self._get_instances(ids)
+        with transaction.atomic():
+            delete_objects(self.get_queryset().model, ids)
+        # The per-object signals are suspended for bulk deletions
+        bump_version(request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,159 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.cache import get_conditional_response, \
+    patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.db.routers import read_alias
+
+
+def _cache():
+    return caches[settings.RECIPE_CACHE['CACHE_ALIAS']]
+
+
+def _version_key(user_id):
+    return f'recipe-api-version:{user_id}'
+
+
+def _modified_key(user_id):
+    return f'recipe-api-modified:{user_id}'
+
+
+def get_version(user_id):
+    """Return the current version of a user's recipe data"""
+    version = _cache().get(_version_key(user_id))
+    if version is None:
+        # Start from the current time, so a version evicted from the cache
+        # is never reused with responses cached under an older value
+        _cache().add(_version_key(user_id), int(time.time() * 1000), None)
+        version = _cache().get(_version_key(user_id))
+
+    return version
+
+
+def bump_version(user_id):
+    """Invalidate every cached response for a user's recipe data, once the
+    current transaction commits
+
+    Bumped earlier, a request reading the data before the commit could
+    cache the data being replaced under the new version.
+    """
+    transaction.on_commit(lambda: _bump_version(user_id))
+
+
+def _bump_version(user_id):
+    try:
+        _cache().incr(_version_key(user_id))
+    except ValueError:
+        get_version(user_id)
+    _cache().set(_modified_key(user_id), time.time(), None)
+
+
+def last_modified(user_id):
+    """Return the time a user's recipe data last changed, as a timestamp"""
+    modified = _cache().get(_modified_key(user_id))
+    if modified is None:
+        # Unknown once evicted, so assume it just changed
+        _cache().add(_modified_key(user_id), time.time(), None)
+        modified = _cache().get(_modified_key(user_id))
+
+    return modified
+
+
+class CachedResponseMixin:
+    """Cache list and retrieve responses per user
+
+    Cache keys and ETags include the user's data version, which the signals
+    in recipe.signals bump on every change, so stale entries are never
+    served and simply expire. Requests whose If-None-Match matches the
+    current ETag get a 304 without touching the database, as do requests
+    whose If-Modified-Since is not older than get_last_modified().
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_last_modified(self):
+        """Return the time the requested data last changed, as a timestamp,
+        or None if unknown. Lists change whenever any of the user's data
+        does, including deletions, which leave no timestamp behind.
+        """
+        return last_modified(self.request.user.pk)
+
+    def _may_lag(self, modified):
+        """Return whether the response just built may miss writes made up
+        to the time modified, having been read from a replica too soon
+        after them
+
+        Only the client which wrote is pinned to the primary, so caching
+        such a response would serve it the data it replaced.
+        """
+        if read_alias() == DEFAULT_DB_ALIAS:
+            return False
+        return (
+            time.time() - modified <
+            settings.DATABASE_REPLICA_PIN['SECONDS']
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Return the cached response for this request, or build it with
+        handler and cache it
+        """
+        version = get_version(request.user.pk)
+        digest = hashlib.md5(':'.join((
+            str(request.user.pk),
+            str(version),
+            request.accepted_renderer.format,
+            # Responses link to other pages with absolute URLs
+            request.build_absolute_uri(),
+        )).encode()).hexdigest()
+        etag = f'"{digest}"'
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = f'recipe-api-response:{digest}'
+            cached = _cache().get(key)
+            if cached is None:
+                # Read before building the response, so changes made while
+                # it is built are never hidden behind an older time
+                modified = self.get_last_modified()
+                response = handler(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cached = (response.data, modified)
+                if not self._may_lag(modified):
+                    _cache().set(
+                        key,
+                        cached,
+                        settings.RECIPE_CACHE['TIMEOUT']
+                    )
+
+            data, modified = cached
+            if modified is not None:
+                # HTTP dates have a resolution of one second
+                modified = int(modified)
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=modified
+            )
+            if response is None:
+                response = Response(data)
+                if modified is not None:
+                    response['Last-Modified'] = http_date(modified)
+
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Authorization',))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
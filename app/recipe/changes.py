@@ -0,0 +1,103 @@
+import threading
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import BigIntegerField, Q
+from django.db.models.expressions import RawSQL
+
+from core.models import Tag, Ingredient, Recipe, Change
+
+# Synced models by their name in the change log
+SYNCED_MODELS = {
+    'recipe': Recipe,
+    'tag': Tag,
+    'ingredient': Ingredient,
+}
+
+# Overwrites the object's earlier change, so the log holds one row per
+# object and clients only ever download an object's latest state
+RECORD_SQL = f"""
+    INSERT INTO {Change._meta.db_table} (user_id, model, object_id, txid)
+    SELECT changed.user_id, %s, changed.id, txid_current()
+    FROM ({{objects}}) changed
+    ON CONFLICT (model, object_id) DO UPDATE SET txid = EXCLUDED.txid
+"""
+
+# Transactions before this one have all committed or rolled back, so no
+# change recorded by them can appear later
+HORIZON_SQL = 'txid_snapshot_xmin(txid_current_snapshot())'
+
+_local = threading.local()
+
+
+def deleting_users():
+    """Return the set of ids of the users being deleted by this thread
+
+    Their change log is deleted along with them, before their objects, so
+    changes to those objects are not recorded.
+    """
+    if not hasattr(_local, 'deleting_users'):
+        _local.deleting_users = set()
+    return _local.deleting_users
+
+
+def record_changes(objects):
+    """Record that a queryset of recipes, tags or ingredients changed"""
+    if deleting_users():
+        objects = objects.exclude(user_id__in=deleting_users())
+    try:
+        sql, params = objects.order_by().values(
+            'user_id', 'id'
+        ).query.sql_with_params()
+    except EmptyResultSet:
+        # Filtered by an empty list of ids
+        return
+    with connections[objects.db].cursor() as cursor:
+        cursor.execute(
+            RECORD_SQL.format(objects=sql),
+            [objects.model._meta.model_name, *params]
+        )
+
+
+def record_deletion(instance):
+    """Record that a recipe, tag or ingredient was deleted"""
+    if instance.user_id in deleting_users():
+        return
+    with connections[instance._state.db].cursor() as cursor:
+        cursor.execute(
+            RECORD_SQL.format(objects='SELECT %s AS user_id, %s AS id'),
+            [instance._meta.model_name, instance.user_id, instance.pk]
+        )
+
+
+def format_token(txid, change_id):
+    """Return the sync token of the position after a change"""
+    return f'{txid}-{change_id}'
+
+
+def parse_token(token):
+    """Return the (txid, change id) position of a sync token"""
+    txid, change_id = token.split('-')
+    return int(txid), int(change_id)
+
+
+def read_changes(user, since, limit):
+    """Return the next changes to a user's objects after the (txid, change
+    id) position since, up to limit, in transaction order
+
+    Only transactions older than any still running are read, so a change
+    committing late can never land behind a position already returned.
+    """
+    txid, change_id = since
+    return Change.objects.filter(
+        Q(txid__gt=txid) | Q(id__gt=change_id),
+        user=user,
+        # Lets the (user, txid, id) index start the scan at the position
+        txid__gte=txid,
+        txid__lt=RawSQL(HORIZON_SQL, (), output_field=BigIntegerField())
+    ).order_by('txid', 'id').values_list(
+        'model',
+        'object_id',
+        'txid',
+        'id'
+    )[:limit]
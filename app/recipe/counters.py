@@ -0,0 +1,48 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Tag, Ingredient, Recipe
+from recipe.changes import record_changes
+
+# Recipe M2M field linking recipes to each counted model
+RECIPE_FIELDS = {
+    Tag: 'tags',
+    Ingredient: 'ingredients',
+}
+
+
+def _links(model):
+    """Return the through model linking recipes to model, and the name of
+    its column referencing model
+    """
+    field = Recipe._meta.get_field(RECIPE_FIELDS[model])
+    return field.remote_field.through, field.m2m_reverse_name()
+
+
+def update_recipe_counts(objects):
+    """Recount the recipes linked to a queryset of tags or ingredients, and
+    record the change for sync clients
+    """
+    through, column = _links(objects.model)
+    counts = through.objects.filter(
+        **{column: OuterRef('pk')}
+    ).order_by().values(column).annotate(
+        count=Count('*')
+    ).values('count')
+    objects.update(
+        recipe_count=Coalesce(
+            Subquery(counts, output_field=IntegerField()),
+            0
+        ),
+        updated=timezone.now()
+    )
+    record_changes(objects)
+
+
+def linked_ids(model, recipe_ids):
+    """Return the ids of the model objects linked to the given recipes"""
+    through, column = _links(model)
+    return set(through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values_list(column, flat=True))
@@ -0,0 +1,95 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core.models import Recipe
+from recipe.caching import bump_version
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.RECIPE_IMAGE_WORKERS,
+    thread_name_prefix='recipe-images'
+)
+
+# Formats variants are generated in, by file extension
+VARIANT_FORMATS = {
+    'jpg': 'JPEG',
+    'webp': 'WEBP',
+}
+
+
+def schedule_image_processing(recipe_id):
+    """Process a recipe's image in the background once the current
+    transaction commits
+    """
+    transaction.on_commit(
+        lambda: executor.submit(_process_in_background, recipe_id)
+    )
+
+
+def _process_in_background(recipe_id):
+    try:
+        process_recipe_image(recipe_id)
+    except Exception:
+        logger.exception('Processing image of recipe %s failed', recipe_id)
+    finally:
+        # Worker threads get their own connections, which Django's request
+        # cycle never closes
+        connections.close_all()
+
+
+def _save_image(image, name, image_format):
+    """Encode image in image_format and store it under name"""
+    buffer = io.BytesIO()
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(buffer, format=image_format, quality=85)
+    default_storage.delete(name)
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def process_recipe_image(recipe_id):
+    """Strip the metadata from a recipe's image and generate its resized
+    variants, recording them on the recipe
+    """
+    recipe = Recipe.objects.get(pk=recipe_id)
+    if not recipe.image:
+        return
+    name = recipe.image.name
+
+    with default_storage.open(name) as file:
+        original = Image.open(file)
+        image_format = original.format
+        # Apply the EXIF orientation before dropping the metadata
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    # Re-encoding only keeps the pixel data, dropping EXIF and other
+    # metadata such as camera details and GPS location
+    _save_image(image, name, image_format)
+
+    root = os.path.splitext(name)[0]
+    variants = {}
+    for size in settings.RECIPE_IMAGE_SIZES:
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        variants[str(size)] = {
+            ext: _save_image(resized, f'{root}_{size}.{ext}', variant_format)
+            for ext, variant_format in VARIANT_FORMATS.items()
+        }
+
+    # Skip recording the variants if another image was uploaded meanwhile
+    Recipe.objects.filter(pk=recipe_id, image=name).update(
+        image_variants=variants,
+        updated=timezone.now()
+    )
+    bump_version(recipe.user_id)
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Tag, Recipe
+from recipe import benchmark
+from recipe.views import RecipeViewSet, TagViewSet
+
+
+class Command(BaseCommand):
+    """Django command to compare the JOIN + DISTINCT filters with the
+    semi-join filters used by the recipe API
+    """
+    help = 'Compare query plans and timings of the recipe API filters ' \
+           'on seeded data. All seeded data is rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.stdout.write('Seeding data...')
+            user = benchmark.seed(options['users'], options['rows'])[-1]
+            tag_ids = list(
+                Tag.objects.filter(user=user).order_by('id')
+                .values_list('id', flat=True)[:10]
+            )
+
+            cases = (
+                (
+                    'Tags assigned to recipes',
+                    Tag.objects.filter(user=user, recipe__isnull=False)
+                    .order_by('-name').distinct(),
+                    benchmark.view_queryset(
+                        TagViewSet, user, {'assigned_only': 1}
+                    ),
+                ),
+                (
+                    'Recipes filtered by tags',
+                    Recipe.objects.filter(user=user, tags__id__in=tag_ids)
+                    .order_by('-id'),
+                    benchmark.view_queryset(
+                        RecipeViewSet,
+                        user,
+                        {'tags': ','.join(str(pk) for pk in tag_ids)}
+                    ),
+                ),
+            )
+            for name, join_queryset, semi_join_queryset in cases:
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.compare(
+                    join_queryset,
+                    semi_join_queryset,
+                    options['page_size'],
+                    options['repeat']
+                )
+
+            transaction.set_rollback(True)
+
+    def compare(self, join_queryset, semi_join_queryset, page_size, repeat):
+        """Print the plan and median timing of a page of each queryset"""
+        for label, queryset in (
+            ('JOIN', join_queryset),
+            ('Semi-join', semi_join_queryset),
+        ):
+            # Only time the filter query itself
+            page = queryset.prefetch_related(None)[:page_size]
+            duration = benchmark.timeit(lambda: list(page.all()), repeat)
+            self.stdout.write(
+                self.style.SUCCESS(f'{label}: {duration * 1000:.2f} ms, '
+                                   f'{len(page)} rows')
+            )
+            self.stdout.write(page.explain(analyze=True))
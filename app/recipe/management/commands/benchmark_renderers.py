@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer, orjson
+from recipe import benchmark
+
+
+class Command(BaseCommand):
+    """Django command to compare rendering recipe lists with the stdlib
+    and fast JSON renderers
+    """
+    help = 'Compare the time taken to render a large list of recipes ' \
+           'with the stdlib and orjson based JSON renderers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson is not installed, so both renderers use json'
+            ))
+
+        # Shaped like a recipe list response
+        data = {
+            'next': None,
+            'previous': None,
+            'results': [
+                {
+                    'id': i,
+                    'title': f'Recipe {i}',
+                    'ingredients': [i, i % 10 + 1],
+                    'tags': [i, i % 10 + 1],
+                    'time_minutes': i % 180,
+                    'price': str(Decimal(i % 100) / 4),
+                    'link': f'https://example.com/recipes/{i}',
+                }
+                for i in range(options['recipes'])
+            ],
+        }
+
+        for label, renderer in (
+            ('JSONRenderer', JSONRenderer()),
+            ('FastJSONRenderer', FastJSONRenderer()),
+        ):
+            duration = benchmark.timeit(
+                lambda: renderer.render(data),
+                options['repeat']
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'{label}: {duration * 1000:.2f} ms')
+            )
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Tag
+from recipe import benchmark
+from recipe.rows import recipe_rows, serialize_recipe_rows
+from recipe.serializers import TagSerializer, RecipeSerializer
+from recipe.views import RecipeViewSet
+
+
+class Command(BaseCommand):
+    """Django command to compare rendering list pages through the
+    serializers with rendering them from .values() rows
+    """
+    help = 'Compare the time taken to build a page of recipes and tags ' \
+           'with serializers and from rows on seeded data. All seeded ' \
+           'data is rolled back afterwards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        with transaction.atomic():
+            self.stdout.write('Seeding data...')
+            user = benchmark.seed(options['users'], options['rows'])[-1]
+            # As listed by the API, with ordered prefetches
+            recipes = benchmark.view_queryset(RecipeViewSet, user)
+            tags = Tag.objects.filter(user=user).order_by('-name')
+            price = RecipeSerializer().fields['price']
+
+            cases = (
+                (
+                    'Recipes',
+                    lambda: RecipeSerializer(
+                        recipes[:page_size],
+                        many=True
+                    ).data,
+                    lambda: serialize_recipe_rows(
+                        recipe_rows(recipes)[:page_size],
+                        price
+                    ),
+                ),
+                (
+                    'Tags',
+                    lambda: TagSerializer(tags[:page_size], many=True).data,
+                    lambda: list(
+                        tags.values('id', 'name', 'recipe_count')[:page_size]
+                    ),
+                ),
+            )
+            for name, serialize, serialize_rows in cases:
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.compare(serialize, serialize_rows, options['repeat'])
+
+            transaction.set_rollback(True)
+
+    def compare(self, serialize, serialize_rows, repeat):
+        """Print the median time taken by each way of building a page, and
+        check both render the same JSON
+        """
+        renderer = JSONRenderer()
+        if renderer.render(serialize()) != renderer.render(serialize_rows()):
+            self.stdout.write(self.style.ERROR('Rendered output differs'))
+
+        for label, func in (
+            ('Serializers', serialize),
+            ('Rows', serialize_rows),
+        ):
+            duration = benchmark.timeit(func, repeat)
+            self.stdout.write(
+                self.style.SUCCESS(f'{label}: {duration * 1000:.2f} ms')
+            )
@@ -0,0 +1,25 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination for recipes, newest first
+
+    Each page is fetched with a `WHERE id < <cursor>` filter rather than an
+    OFFSET, so pages deep into a large collection cost the same as the first.
+    """
+    ordering = '-id'
+    page_size = settings.RECIPE_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.RECIPE_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        """Return the view's ordering, which may depend on the request"""
+        if hasattr(view, 'get_ordering'):
+            return tuple(view.get_ordering())
+        return super().get_ordering(request, queryset, view)
+
+
+class RecipeAttrCursorPagination(RecipeCursorPagination):
+    """Keyset pagination for tags and ingredients, by name"""
+    ordering = ('-name', 'id')
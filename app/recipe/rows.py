@@ -0,0 +1,93 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import IntegerField, OuterRef, Subquery
+from rest_framework.response import Response
+
+from core.metrics import timing_serialization
+
+from core.models import Recipe
+
+
+class ArraySubquery(Subquery):
+    """Subquery of a single integer column, returned as a Postgres array"""
+    template = 'ARRAY(%(subquery)s)'
+    output_field = ArrayField(IntegerField())
+
+
+def linked_ids(field_name):
+    """Return an array of the ids linked to the outer recipe through one of
+    its M2M fields, in id order
+    """
+    column = Recipe._meta.get_field(field_name).m2m_reverse_name()
+    links = getattr(Recipe, field_name).through.objects.filter(
+        recipe=OuterRef('pk')
+    )
+    return ArraySubquery(links.order_by(column).values(column))
+
+
+def recipe_rows(queryset, *extra_fields):
+    """Return a queryset of the rows needed to render recipes with
+    serialize_recipe_rows, plus any extra_fields
+    """
+    return queryset.prefetch_related(None).values(
+        'id',
+        'title',
+        'time_minutes',
+        'price',
+        'link',
+        *extra_fields,
+        ingredient_ids=linked_ids('ingredients'),
+        tag_ids=linked_ids('tags')
+    )
+
+
+def serialize_recipe_rows(rows, price_field):
+    """Return the representation RecipeSerializer gives recipes, built from
+    recipe_rows in one pass
+    """
+    price = price_field.to_representation
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'ingredients': row['ingredient_ids'],
+            'tags': row['tag_ids'],
+            'time_minutes': row['time_minutes'],
+            'price': price(row['price']),
+            'link': row['link'],
+        }
+        for row in rows
+    ]
+
+
+class RowsListMixin:
+    """List objects from .values() rows rather than through serializers
+
+    Building model instances and running each serializer field's
+    to_representation dominates the cost of large pages. Views return a
+    values queryset from get_list_rows(), or None to fall back to the
+    serializers, and turn a page of rows into representations identical to
+    the serializer's in serialize_rows().
+    """
+
+    def get_list_rows(self, queryset):
+        return None
+
+    def serialize_rows(self, rows):
+        return list(rows)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = self.get_list_rows(queryset)
+        if rows is None:
+            def serialize(objects):
+                return self.get_serializer(objects, many=True).data
+        else:
+            queryset = rows
+            serialize = self.serialize_rows
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with timing_serialization():
+                data = serialize(page)
+            return self.get_paginated_response(data)
+        return Response(serialize(queryset))
@@ -0,0 +1,96 @@
+import threading
+from contextlib import contextmanager
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, \
+    SearchVector
+from django.db.models import F, OuterRef, Subquery
+
+from core.models import Tag, Ingredient, Recipe
+
+# Text search configuration used to build and query recipe search vectors
+SEARCH_CONFIG = 'english'
+
+_deferred = threading.local()
+
+
+def _linked_names(model):
+    """Return a subquery joining the names of the model objects linked to
+    the outer recipe
+    """
+    names = model.objects.filter(
+        recipe=OuterRef('pk')
+    ).values('recipe').annotate(
+        names=StringAgg('name', ' ')
+    ).values('names')
+    return Subquery(names)
+
+
+def recipe_search_vector():
+    """Return an expression for the search vector of a recipe, weighting
+    its title above the names of its tags and ingredients
+    """
+    return SearchVector(
+        'title',
+        weight='A',
+        config=SEARCH_CONFIG
+    ) + SearchVector(
+        _linked_names(Tag),
+        _linked_names(Ingredient),
+        weight='B',
+        config=SEARCH_CONFIG
+    )
+
+
+def update_search_vectors(recipes):
+    """Rebuild the stored search vectors of a queryset of recipes"""
+    recipes.update(search_vector=recipe_search_vector())
+
+
+@contextmanager
+def deferred_search_vectors():
+    """Collect the recipes whose search vectors rebuild_search_vectors()
+    is asked to rebuild while the block runs, and rebuild each of them once
+    when it ends
+
+    Saving a recipe and setting its tags and ingredients each need its
+    search vector rebuilt, so a write doing all three would otherwise
+    rebuild it three times.
+    """
+    if getattr(_deferred, 'recipe_ids', None) is not None:
+        yield
+        return
+    _deferred.recipe_ids = set()
+    try:
+        yield
+        recipe_ids = _deferred.recipe_ids
+    finally:
+        _deferred.recipe_ids = None
+    if recipe_ids:
+        update_search_vectors(Recipe.objects.filter(pk__in=recipe_ids))
+
+
+def rebuild_search_vectors(recipe_ids):
+    """Rebuild the search vectors of recipes by id, at the end of the
+    enclosing deferred_search_vectors() block if there is one
+    """
+    pending = getattr(_deferred, 'recipe_ids', None)
+    if pending is None:
+        update_search_vectors(Recipe.objects.filter(pk__in=recipe_ids))
+    else:
+        pending.update(recipe_ids)
+
+
+def linked_recipes(instance):
+    """Return the recipes a tag or ingredient is linked to"""
+    return Recipe.objects.filter(pk__in=instance.recipe_set.values('pk'))
+
+
+def search_recipes(queryset, text):
+    """Filter a queryset of recipes to those matching text, annotated with
+    their rank
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG)
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    )
@@ -1,32 +1,186 @@
-from rest_framework import serializers
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+from django.db.models import prefetch_related_objects
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from core.models import Tag, Ingredient, Recipe
+from core.serializers import TimedSerializerMixin
+from recipe.changes import record_changes
+from recipe.counters import update_recipe_counts
+from recipe.search import deferred_search_vectors, update_search_vectors
+
+
+class UserManyRelatedField(serializers.ManyRelatedField):
+    """Field for a list of primary keys, resolved with a single query"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pks = []
+        for item in data:
+            try:
+                pks.append(queryset.model._meta.pk.to_python(item))
+            except DjangoValidationError:
+                child.fail('incorrect_type', data_type=type(item).__name__)
+
+        # Objects resolved for earlier items of a bulk request are reused
+        resolved = self.root.__dict__.setdefault('_resolved_objects', {})
+        objects = resolved.setdefault(queryset.model, {})
+        objects.update(
+            queryset.in_bulk([pk for pk in pks if pk not in objects])
+        )
+
+        missing = [pk for pk in dict.fromkeys(pks) if pk not in objects]
+        if missing:
+            raise serializers.ValidationError([
+                child.error_messages['does_not_exist'].format(pk_value=pk)
+                for pk in missing
+            ])
+        return [objects[pk] for pk in pks]
+
+
+class UserPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field limited to the requesting user's objects"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return UserManyRelatedField(**list_kwargs)
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return super().get_queryset().none()
+        return super().get_queryset().filter(user=request.user)
+
+
+class BulkListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """Serializer for lists of objects, creating them with one insert"""
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objects = model.objects.bulk_create(
+            model(**attrs) for attrs in validated_data
+        )
+        # Bulk inserts do not send the signals which record changes
+        record_changes(
+            model.objects.filter(pk__in=[obj.pk for obj in objects])
+        )
+        return objects
 
+    def update(self, instances, validated_data):
+        """Update each instance with the item at the same position"""
+        return [
+            self.child.update(instance, attrs)
+            for instance, attrs in zip(instances, validated_data)
+        ]
 
-class TagSerializer(serializers.ModelSerializer):
+
+class RecipeListSerializer(BulkListSerializer):
+    """Serializer for lists of recipes, linking them with one insert per
+    M2M table
+    """
+
+    def create(self, validated_data):
+        links = [
+            (attrs.pop('tags', []), attrs.pop('ingredients', []))
+            for attrs in validated_data
+        ]
+        recipes = super().create(validated_data)
+
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.id)
+            for recipe, (tags, _) in zip(recipes, links)
+            for tag in dict.fromkeys(tags)
+        )
+        Recipe.ingredients.through.objects.bulk_create(
+            Recipe.ingredients.through(
+                recipe_id=recipe.id,
+                ingredient_id=ingredient.id
+            )
+            for recipe, (_, ingredients) in zip(recipes, links)
+            for ingredient in dict.fromkeys(ingredients)
+        )
+        # Bulk inserts do not send the signals which maintain search vectors
+        # and recipe counts
+        update_search_vectors(
+            Recipe.objects.filter(pk__in=[recipe.id for recipe in recipes])
+        )
+        update_recipe_counts(Tag.objects.filter(pk__in={
+            tag.id for tags, _ in links for tag in tags
+        }))
+        update_recipe_counts(Ingredient.objects.filter(pk__in={
+            ingredient.id for _, ingredients in links
+            for ingredient in ingredients
+        }))
+        prefetch_related_objects(recipes, 'tags', 'ingredients')
+        return recipes
+
+
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for tag objects"""
 
     class Meta:
         model = Tag
-        fields = ('id', 'name',)
-        read_only_fields = ('id',)
+        fields = ('id', 'name', 'recipe_count',)
+        read_only_fields = ('id', 'recipe_count',)
+        list_serializer_class = BulkListSerializer
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
     """Serializer for the ingredient objects"""
 
     class Meta:
         model = Ingredient
-        fields = ('id', 'name',)
-        read_only_fields = ('id',)
+        fields = ('id', 'name', 'recipe_count',)
+        read_only_fields = ('id', 'recipe_count',)
+        list_serializer_class = BulkListSerializer
+
+
+class DynamicFieldsMixin:
+    """Serializer mixin limiting the fields to the names in the 'fields'
+    context, if given, and nesting the related objects named in the
+    'expand' context with the serializers in expandable_fields
+    """
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.context.get('expand') or ():
+            if name in self.expandable_fields:
+                fields[name] = self.expandable_fields[name](
+                    many=True,
+                    read_only=True
+                )
 
+        requested = self.context.get('fields')
+        if requested is not None:
+            fields = OrderedDict(
+                (name, field) for name, field in fields.items()
+                if name in requested
+            )
+        return fields
 
-class RecipeSerializer(serializers.ModelSerializer):
+
+class RecipeSerializer(TimedSerializerMixin, DynamicFieldsMixin,
+                       serializers.ModelSerializer):
     """Serializer for the recipe objects"""
-    ingredients = serializers.PrimaryKeyRelatedField(
+    ingredients = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Ingredient.objects.all()
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all()
     )
@@ -43,18 +197,140 @@ class RecipeSerializer(serializers.ModelSerializer):
             'link',
         )
         read_only_fields = ('id',)
+        list_serializer_class = RecipeListSerializer
+
+    expandable_fields = {
+        'tags': TagSerializer,
+        'ingredients': IngredientSerializer,
+    }
+
+    def create(self, validated_data):
+        # The recipe's search vector is rebuilt once, after its tags and
+        # ingredients are set
+        with deferred_search_vectors():
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with deferred_search_vectors():
+            return super().update(instance, validated_data)
+
+
+class NameListField(serializers.ListField):
+    """Field for a list of tag or ingredient names, which are also accepted
+    as one string of names separated by semicolons, as in CSV
+    """
+    child = serializers.CharField(max_length=255)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [name.strip() for name in data.split(';') if name.strip()]
+        return super().to_internal_value(data)
+
+
+class RecipeTransferSerializer(serializers.ModelSerializer):
+    """Serializer for recipes in exports and imports, which name their tags
+    and ingredients so they can be imported by any user
+    """
+    ingredients = NameListField(required=False)
+    tags = NameListField(required=False)
+
+    class Meta:
+        model = Recipe
+        fields = (
+            'title',
+            'ingredients',
+            'tags',
+            'time_minutes',
+            'price',
+            'link',
+        )
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Field for the URLs of a recipe image's resized variants"""
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        urls = {}
+        for size, formats in value.items():
+            urls[size] = {}
+            for ext, name in formats.items():
+                url = default_storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[size][ext] = url
+        return urls
 
 
 class RecipeDetailSerializer(RecipeSerializer):
     """Serialize a recipe detail"""
     ingredients = IngredientSerializer(many=True, read_only=True)
     tags = TagSerializer(many=True, read_only=True)
+    image_variants = ImageVariantsField()
 
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ('image', 'image_variants',)
+        read_only_fields = ('id', 'image',)
 
-class RecipeImageSerializer(serializers.ModelSerializer):
+
+class RecipeImageSerializer(TimedSerializerMixin,
+                            serializers.ModelSerializer):
     """Serializer for uploading images to recipes"""
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'image',)
+        fields = ('id', 'image', 'image_variants',)
         read_only_fields = ('id',)
+
+
+class ModifiedSinceSerializer(serializers.Serializer):
+    """Serializer for the query parameter limiting lists to the objects
+    changed since a time, given in ISO 8601 or as an HTTP date such as a
+    previous response's Last-Modified
+    """
+    modified_since = serializers.DateTimeField(
+        input_formats=(ISO_8601, '%a, %d %b %Y %H:%M:%S GMT'),
+        required=False
+    )
+
+
+class RecipeFilterSerializer(ModifiedSinceSerializer):
+    """Serializer for the range and ordering query parameters of the
+    recipe list
+    """
+    ORDERING_CHOICES = ('time_minutes', '-time_minutes', 'price', '-price')
+
+    max_time = serializers.IntegerField(min_value=0, required=False)
+    min_price = serializers.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        required=False
+    )
+    max_price = serializers.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        required=False
+    )
+    ordering = serializers.ChoiceField(
+        choices=ORDERING_CHOICES,
+        required=False
+    )
+
+
+class RecipeStatsSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for the aggregates of a user's recipes"""
+    recipe_count = serializers.IntegerField()
+    tag_count = serializers.IntegerField()
+    ingredient_count = serializers.IntegerField()
+    average_time_minutes = serializers.FloatField(allow_null=True)
+    min_price = serializers.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        allow_null=True
+    )
+    max_price = serializers.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        allow_null=True
+    )
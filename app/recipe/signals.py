@@ -0,0 +1,238 @@
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, \
+    pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Tag, Ingredient, Recipe
+from recipe.caching import bump_version
+from recipe.changes import deleting_users, record_changes, \
+    record_deletion
+from recipe.counters import linked_ids, update_recipe_counts
+from recipe.search import linked_recipes, rebuild_search_vectors, \
+    update_search_vectors
+
+_bulk_deletion = threading.local()
+
+
+@contextmanager
+def bulk_deletion():
+    """Suspend the handlers maintaining recipe data for each deleted
+    object, while the caller deletes objects in bulk and maintains it for
+    all of them at once
+    """
+    _bulk_deletion.active = True
+    try:
+        yield
+    finally:
+        _bulk_deletion.active = False
+
+
+def deleting_in_bulk():
+    """Return whether objects are being deleted within bulk_deletion()"""
+    return getattr(_bulk_deletion, 'active', False)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+def invalidate_saved(sender, instance, **kwargs):
+    """Invalidate cached responses when recipe data changes"""
+    if deleting_in_bulk():
+        return
+    bump_version(instance.user_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_save, sender=Recipe)
+def record_saved(sender, instance, **kwargs):
+    """Record saved objects for sync clients"""
+    record_changes(sender.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+def record_deleted(sender, instance, **kwargs):
+    """Record deleted objects for sync clients"""
+    if deleting_in_bulk():
+        return
+    record_deletion(instance)
+
+
+@receiver(pre_delete, sender=get_user_model())
+def stop_recording_changes(sender, instance, **kwargs):
+    """Stop recording changes to the objects of a user being deleted, as
+    the change log rows would refer to the deleted user
+    """
+    deleting_users().add(instance.pk)
+
+
+@receiver(post_delete, sender=get_user_model())
+def resume_recording_changes(sender, instance, **kwargs):
+    """Record changes for a deleted user's id again"""
+    deleting_users().discard(instance.pk)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_linked(sender, instance, action, **kwargs):
+    """Invalidate cached responses when recipe links change"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version(instance.user_id)
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_vector(sender, instance, update_fields=None,
+                                **kwargs):
+    """Rebuild the search vector of a saved recipe"""
+    if update_fields is None or 'title' in update_fields:
+        rebuild_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def update_renamed_search_vectors(sender, instance, created, **kwargs):
+    """Rebuild the search vectors of the recipes linked to a saved tag or
+    ingredient, whose name may have changed
+    """
+    if not created:
+        update_search_vectors(linked_recipes(instance))
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def remember_linked_recipes(sender, instance, **kwargs):
+    """Record the recipes linked to a tag or ingredient before the links
+    are deleted along with it
+    """
+    if deleting_in_bulk():
+        return
+    instance._linked_recipe_ids = list(
+        linked_recipes(instance).values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def update_unlinked_search_vectors(sender, instance, **kwargs):
+    """Rebuild the search vectors of the recipes a deleted tag or
+    ingredient was linked to
+    """
+    if deleting_in_bulk():
+        return
+    rebuild_search_vectors(instance._linked_recipe_ids)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_linked_search_vectors(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    """Rebuild the search vectors of recipes whose links changed"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            rebuild_search_vectors([instance.pk])
+    elif action == 'pre_clear':
+        remember_linked_recipes(sender, instance)
+    elif action == 'post_clear':
+        update_unlinked_search_vectors(sender, instance)
+    elif action in ('post_add', 'post_remove'):
+        rebuild_search_vectors(pk_set)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_linked_recipe_counts(sender, instance, action, reverse, model,
+                                pk_set, **kwargs):
+    """Recount the recipes of the tags or ingredients whose links changed"""
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            update_recipe_counts(
+                type(instance).objects.filter(pk=instance.pk)
+            )
+        return
+
+    if action == 'pre_clear':
+        # The links are gone by post_clear, so record what they were
+        instance._cleared_ids = linked_ids(model, [instance.pk])
+    elif action == 'post_clear':
+        update_recipe_counts(
+            model.objects.filter(pk__in=instance._cleared_ids)
+        )
+    elif action in ('post_add', 'post_remove'):
+        update_recipe_counts(model.objects.filter(pk__in=pk_set))
+
+
+@receiver(pre_delete, sender=Recipe)
+def remember_linked_objects(sender, instance, **kwargs):
+    """Record the tags and ingredients of a recipe before its links are
+    deleted along with it
+    """
+    if deleting_in_bulk():
+        return
+    instance._linked_ids = {
+        model: linked_ids(model, [instance.pk])
+        for model in (Tag, Ingredient)
+    }
+
+
+@receiver(post_delete, sender=Recipe)
+def update_unlinked_recipe_counts(sender, instance, **kwargs):
+    """Recount the recipes of the tags and ingredients a deleted recipe
+    used
+    """
+    if deleting_in_bulk():
+        return
+    for model, ids in instance._linked_ids.items():
+        if ids:
+            update_recipe_counts(model.objects.filter(pk__in=ids))
+
+
+def touch_recipes(recipe_ids):
+    """Mark recipes as updated without saving them, and record the change
+    for sync clients
+    """
+    recipes = Recipe.objects.filter(pk__in=recipe_ids)
+    recipes.update(updated=timezone.now())
+    record_changes(recipes)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def touch_renamed_recipes(sender, instance, created, **kwargs):
+    """Mark the recipes linked to a saved tag or ingredient as updated"""
+    if not created:
+        touch_recipes(linked_recipes(instance).values('pk'))
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def touch_unlinked_recipes(sender, instance, **kwargs):
+    """Mark the recipes a deleted tag or ingredient was linked to as
+    updated
+    """
+    if deleting_in_bulk():
+        return
+    touch_recipes(instance._linked_recipe_ids)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def touch_relinked_recipes(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Mark recipes whose links changed as updated"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            touch_recipes([instance.pk])
+    elif action == 'post_clear':
+        # Recorded on pre_clear by update_linked_search_vectors
+        touch_recipes(instance._linked_recipe_ids)
+    elif action in ('post_add', 'post_remove'):
+        touch_recipes(pk_set)
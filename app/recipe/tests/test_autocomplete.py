@@ -0,0 +1,155 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient, Recipe
+from recipe.autocomplete import autocomplete_cache
+
+TAG_AUTOCOMPLETE_URL = reverse('recipe:tag-autocomplete')
+INGREDIENT_AUTOCOMPLETE_URL = reverse('recipe:ingredient-autocomplete')
+
+
+class AutocompleteTests(TransactionTestCase):
+    """Test autocompleting tag and ingredient names"""
+
+    def setUp(self):
+        cache.clear()
+        autocomplete_cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def names(self, url, text, **params):
+        res = self.client.get(url, {'q': text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [item['name'] for item in res.data]
+
+    def test_prefix_matches_first(self):
+        """Test names starting with the text come before fuzzy matches"""
+        for name in ('Chicken', 'Chickpeas', 'Cheese', 'Chicken stock'):
+            Ingredient.objects.create(user=self.user, name=name)
+
+        names = self.names(INGREDIENT_AUTOCOMPLETE_URL, 'chick')
+
+        # Prefix matches are ordered by similarity, closest first
+        self.assertEqual(names[0], 'Chicken')
+        self.assertEqual(
+            set(names[:3]),
+            {'Chicken', 'Chicken stock', 'Chickpeas'}
+        )
+        self.assertNotIn('Cheese', names)
+
+    def test_fuzzy_matches(self):
+        """Test misspelt names still match"""
+        Tag.objects.create(user=self.user, name='Vegetarian')
+        Tag.objects.create(user=self.user, name='Dessert')
+
+        self.assertEqual(
+            self.names(TAG_AUTOCOMPLETE_URL, 'vegeterian'),
+            ['Vegetarian']
+        )
+
+    def test_limited_to_user(self):
+        """Test other users' names are never suggested"""
+        other = get_user_model().objects.create_user(
+            'other@email.com',
+            'Password1'
+        )
+        Tag.objects.create(user=other, name='Vegan')
+
+        self.assertEqual(self.names(TAG_AUTOCOMPLETE_URL, 'veg'), [])
+
+    def test_limit(self):
+        """Test the number of matches is limited"""
+        for i in range(5):
+            Tag.objects.create(user=self.user, name=f'Vegan {i}')
+
+        self.assertEqual(
+            len(self.names(TAG_AUTOCOMPLETE_URL, 'veg', limit=2)),
+            2
+        )
+
+    @override_settings(RECIPE_AUTOCOMPLETE={'LIMIT': 10, 'MAX_LIMIT': 3})
+    def test_limit_capped(self):
+        """Test the limit cannot exceed the configured maximum"""
+        for i in range(5):
+            Tag.objects.create(user=self.user, name=f'Vegan {i}')
+
+        self.assertEqual(
+            len(self.names(TAG_AUTOCOMPLETE_URL, 'veg', limit=100)),
+            3
+        )
+
+    def test_invalid_limit(self):
+        """Test a limit which is not a number fails"""
+        res = self.client.get(TAG_AUTOCOMPLETE_URL, {'q': 'v', 'limit': 'x'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_empty_text(self):
+        """Test empty text returns no matches without querying"""
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        with self.assertNumQueries(0):
+            names = self.names(TAG_AUTOCOMPLETE_URL, ' ')
+
+        self.assertEqual(names, [])
+
+    def test_assigned_only(self):
+        """Test suggestions can be limited to names used by recipes"""
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        Tag.objects.create(user=self.user, name='Vegetarian')
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Salad',
+            time_minutes=5,
+            price=3.00
+        )
+        recipe.tags.add(vegan)
+
+        self.assertEqual(
+            self.names(TAG_AUTOCOMPLETE_URL, 'veg', assigned_only=1),
+            ['Vegan']
+        )
+
+    def test_filters_cached_separately(self):
+        """Test differently filtered requests get their own matches"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        self.names(TAG_AUTOCOMPLETE_URL, 'veg')
+
+        names = self.names(
+            TAG_AUTOCOMPLETE_URL,
+            'veg',
+            modified_since='2100-01-01T00:00:00Z'
+        )
+
+        self.assertEqual(names, [])
+
+    def test_repeated_prefix_cached(self):
+        """Test repeating a prefix does not query the database"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        self.names(TAG_AUTOCOMPLETE_URL, 'veg')
+
+        with self.assertNumQueries(0):
+            names = self.names(TAG_AUTOCOMPLETE_URL, 'VEG')
+
+        self.assertEqual(names, ['Vegan'])
+
+    def test_changes_invalidate_cache(self):
+        """Test new names are suggested once created"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        self.names(TAG_AUTOCOMPLETE_URL, 'veg')
+
+        Tag.objects.create(user=self.user, name='Vegetarian')
+
+        self.assertEqual(
+            self.names(TAG_AUTOCOMPLETE_URL, 'veg'),
+            ['Vegan', 'Vegetarian']
+        )
@@ -0,0 +1,277 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient, Recipe
+
+RECIPES_BULK_URL = reverse('recipe:recipe-bulk')
+TAGS_BULK_URL = reverse('recipe:tag-bulk')
+INGREDIENTS_BULK_URL = reverse('recipe:ingredient-bulk')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def sample_user(email='test@email.com', password='Password1'):
+    """Create sample user"""
+    return get_user_model().objects.create_user(email, password)
+
+
+class PublicBulkApiTests(TestCase):
+    """Test unauthenticated bulk API access"""
+
+    def test_auth_required(self):
+        res = APIClient().post(RECIPES_BULK_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateBulkApiTests(TransactionTestCase):
+    """Test the bulk create, update and delete endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create_tags(self):
+        """Test creating a list of tags"""
+        payload = [{'name': f'Tag {i}'} for i in range(20)]
+
+        # A single insert and its change log entry
+        with self.assertNumQueries(2):
+            res = self.client.post(TAGS_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 20)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 20)
+        self.assertTrue(all(tag['id'] for tag in res.data))
+
+    def test_bulk_create_ingredients(self):
+        """Test creating a list of ingredients"""
+        payload = [{'name': 'Salt'}, {'name': 'Pepper'}]
+
+        res = self.client.post(INGREDIENTS_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        names = Ingredient.objects.filter(user=self.user).values_list(
+            'name', flat=True
+        )
+        self.assertEqual(set(names), {'Salt', 'Pepper'})
+
+    def test_bulk_create_recipes_with_links(self):
+        """Test creating a list of recipes with tags and ingredients"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        ingredient = Ingredient.objects.create(user=self.user, name='Tofu')
+        payload = [
+            {
+                'title': f'Recipe {i}',
+                'time_minutes': 10,
+                'price': '5.00',
+                'tags': [tag.id],
+                'ingredients': [ingredient.id],
+            }
+            for i in range(10)
+        ]
+
+        res = self.client.post(RECIPES_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 10)
+        for recipe in recipes:
+            self.assertEqual(list(recipe.tags.all()), [tag])
+            self.assertEqual(list(recipe.ingredients.all()), [ingredient])
+        self.assertEqual(res.data[0]['tags'], [tag.id])
+
+    def test_bulk_create_reports_item_errors(self):
+        """Test invalid items are reported and nothing is created"""
+        payload = [
+            {
+                'title': 'Valid',
+                'time_minutes': 10,
+                'price': '5.00',
+                'tags': [],
+                'ingredients': [],
+            },
+            {'title': 'Missing time', 'price': '5.00'},
+        ]
+
+        res = self.client.post(RECIPES_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('time_minutes', res.data[1])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_requires_list(self):
+        """Test the payload must be a list"""
+        res = self.client.post(TAGS_BULK_URL, {'name': 'Vegan'}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_invalidates_cached_list(self):
+        """Test bulk created recipes show up in the cached list"""
+        self.client.get(RECIPES_URL)
+        payload = [{
+            'title': 'Soup',
+            'time_minutes': 10,
+            'price': '5.00',
+            'tags': [],
+            'ingredients': [],
+        }]
+
+        self.client.post(RECIPES_BULK_URL, payload, format='json')
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_bulk_update_invalidates_cached_list(self):
+        """Test bulk updated recipes are changed in the cached list"""
+        recipe = Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=10, price=5
+        )
+        self.client.get(RECIPES_URL)
+
+        self.client.patch(
+            RECIPES_BULK_URL,
+            [{'id': recipe.id, 'title': 'Stew'}],
+            format='json'
+        )
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'][0]['title'], 'Stew')
+
+    def test_bulk_update_recipes(self):
+        """Test updating a list of recipes"""
+        recipe1 = Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=10, price=5
+        )
+        recipe2 = Recipe.objects.create(
+            user=self.user, title='Salad', time_minutes=5, price=4
+        )
+        payload = [
+            {'id': recipe2.id, 'title': 'Green salad'},
+            {'id': recipe1.id, 'time_minutes': 20},
+        ]
+
+        res = self.client.patch(RECIPES_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe1.refresh_from_db()
+        recipe2.refresh_from_db()
+        self.assertEqual(recipe1.time_minutes, 20)
+        self.assertEqual(recipe1.title, 'Soup')
+        self.assertEqual(recipe2.title, 'Green salad')
+        self.assertEqual(res.data[0]['id'], recipe2.id)
+
+    def test_bulk_update_other_users_objects(self):
+        """Test other users' objects cannot be updated"""
+        other = sample_user(email='other@email.com')
+        tag = Tag.objects.create(user=other, name='Vegan')
+
+        res = self.client.patch(
+            TAGS_BULK_URL,
+            [{'id': tag.id, 'name': 'Mine'}],
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'Vegan')
+
+    def test_bulk_delete_tags(self):
+        """Test deleting a list of tags"""
+        tags = [
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+            for i in range(3)
+        ]
+
+        res = self.client.delete(
+            TAGS_BULK_URL,
+            [tags[0].id, tags[1].id],
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Tag.objects.all()), [tags[2]])
+
+    def create_tagged_recipes(self, count, tag, ingredient):
+        recipes = []
+        for i in range(count):
+            recipe = Recipe.objects.create(
+                user=self.user, title=f'Recipe {i}', time_minutes=10, price=5
+            )
+            recipe.tags.add(tag)
+            recipe.ingredients.add(ingredient)
+            recipes.append(recipe.id)
+        return recipes
+
+    def test_bulk_delete_recipes_recounts(self):
+        """Test deleting recipes recounts their tags and ingredients with
+        the same number of queries however many are deleted
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        few = self.create_tagged_recipes(2, tag, salt)
+        many = self.create_tagged_recipes(20, tag, salt)
+        kept = self.create_tagged_recipes(1, tag, salt)
+
+        with CaptureQueriesContext(connection) as few_queries:
+            self.client.delete(RECIPES_BULK_URL, few, format='json')
+        with CaptureQueriesContext(connection) as many_queries:
+            res = self.client.delete(RECIPES_BULK_URL, many, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(len(many_queries), len(few_queries))
+        self.assertEqual(
+            list(Recipe.objects.values_list('id', flat=True)),
+            kept
+        )
+        tag.refresh_from_db()
+        salt.refresh_from_db()
+        self.assertEqual(tag.recipe_count, 1)
+        self.assertEqual(salt.recipe_count, 1)
+
+    def test_bulk_delete_tags_updates_recipes(self):
+        """Test deleting tags updates the recipes they were linked to with
+        the same number of queries however many are deleted
+        """
+        recipe = Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=10, price=5
+        )
+        tags = [
+            Tag.objects.create(user=self.user, name=f'Tag {i}')
+            for i in range(22)
+        ]
+        recipe.tags.add(*tags)
+        ids = [tag.id for tag in tags]
+
+        with CaptureQueriesContext(connection) as few_queries:
+            self.client.delete(TAGS_BULK_URL, ids[:2], format='json')
+        with CaptureQueriesContext(connection) as many_queries:
+            self.client.delete(TAGS_BULK_URL, ids[2:], format='json')
+
+        self.assertEqual(len(many_queries), len(few_queries))
+        self.assertFalse(recipe.tags.exists())
+        self.assertFalse(
+            Recipe.objects.filter(search_vector='tag').exists()
+        )
+
+    def test_bulk_delete_missing_ids(self):
+        """Test nothing is deleted when some ids do not exist"""
+        recipe = Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=10, price=5
+        )
+
+        res = self.client.delete(
+            RECIPES_BULK_URL,
+            [recipe.id, recipe.id + 1],
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
@@ -0,0 +1,177 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient, Recipe
+
+TAGS_URL = reverse('recipe:tag-list')
+RECIPES_BULK_URL = reverse('recipe:recipe-bulk')
+STATS_URL = reverse('recipe:stats-list')
+
+
+def sample_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': 5.00,
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeCountTests(TestCase):
+    """Test the recipe counts of tags and ingredients"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.vegan = Tag.objects.create(user=self.user, name='Vegan')
+        self.dessert = Tag.objects.create(user=self.user, name='Dessert')
+        self.salt = Ingredient.objects.create(user=self.user, name='Salt')
+
+    def assertCounts(self, vegan, dessert, salt):
+        for obj, count in (
+            (self.vegan, vegan),
+            (self.dessert, dessert),
+            (self.salt, salt),
+        ):
+            obj.refresh_from_db()
+            self.assertEqual(obj.recipe_count, count, obj.name)
+
+    def test_counts_listed(self):
+        """Test the tag list includes each tag's recipe count"""
+        sample_recipe(self.user).tags.add(self.vegan)
+
+        res = self.client.get(TAGS_URL)
+
+        counts = {
+            tag['name']: tag['recipe_count'] for tag in res.data['results']
+        }
+        self.assertEqual(counts, {'Vegan': 1, 'Dessert': 0})
+
+    def test_add_and_remove_links(self):
+        """Test linking and unlinking recipes updates the counts"""
+        first = sample_recipe(self.user)
+        second = sample_recipe(self.user)
+        first.tags.add(self.vegan, self.dessert)
+        second.tags.add(self.vegan)
+        second.ingredients.add(self.salt)
+        self.assertCounts(vegan=2, dessert=1, salt=1)
+
+        first.tags.remove(self.vegan)
+        # Removing a tag which is not linked changes nothing
+        first.tags.remove(self.vegan)
+        self.assertCounts(vegan=1, dessert=1, salt=1)
+
+        first.tags.clear()
+        self.salt.recipe_set.clear()
+        self.assertCounts(vegan=1, dessert=0, salt=0)
+
+        self.vegan.recipe_set.add(first)
+        self.assertCounts(vegan=2, dessert=0, salt=0)
+
+    def test_delete_recipe(self):
+        """Test deleting a recipe decrements the counts"""
+        recipe = sample_recipe(self.user)
+        recipe.tags.add(self.vegan)
+        recipe.ingredients.add(self.salt)
+
+        recipe.delete()
+
+        self.assertCounts(vegan=0, dessert=0, salt=0)
+
+    def test_update_recipe_tags(self):
+        """Test replacing a recipe's tags through the API"""
+        recipe = sample_recipe(self.user)
+        recipe.tags.add(self.vegan)
+
+        self.client.patch(
+            reverse('recipe:recipe-detail', args=[recipe.id]),
+            {'tags': [self.dessert.id]}
+        )
+
+        self.assertCounts(vegan=0, dessert=1, salt=0)
+
+    def test_bulk_created_recipes_counted(self):
+        """Test recipes created in bulk are counted"""
+        self.client.post(RECIPES_BULK_URL, [
+            {
+                'title': f'Recipe {i}',
+                'time_minutes': 10,
+                'price': 1.00,
+                'tags': [self.vegan.id],
+                'ingredients': [self.salt.id],
+            }
+            for i in range(3)
+        ], format='json')
+
+        self.assertCounts(vegan=3, dessert=0, salt=3)
+
+
+class RecipeStatsTests(TestCase):
+    """Test the recipe stats endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_login_required(self):
+        """Test authentication is required for the stats"""
+        res = APIClient().get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stats(self):
+        """Test the stats of a user's recipes, in a single query"""
+        sample_recipe(self.user, time_minutes=10, price=2.50)
+        sample_recipe(self.user, time_minutes=25, price=12.00)
+        Tag.objects.create(user=self.user, name='Vegan')
+        Ingredient.objects.create(user=self.user, name='Salt')
+        Ingredient.objects.create(user=self.user, name='Flour')
+        other = get_user_model().objects.create_user(
+            'other@email.com',
+            'Password1'
+        )
+        sample_recipe(other, time_minutes=100, price=99.00)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'recipe_count': 2,
+            'tag_count': 1,
+            'ingredient_count': 2,
+            'average_time_minutes': 17.5,
+            'min_price': '2.50',
+            'max_price': '12.00',
+        })
+
+    def test_stats_without_recipes(self):
+        """Test the stats of a user with no recipes"""
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data, {
+            'recipe_count': 0,
+            'tag_count': 0,
+            'ingredient_count': 0,
+            'average_time_minutes': None,
+            'min_price': None,
+            'max_price': None,
+        })
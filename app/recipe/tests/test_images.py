@@ -0,0 +1,98 @@
+import tempfile
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from recipe.images import process_recipe_image
+
+
+@override_settings(RECIPE_IMAGE_SIZES=[16, 64])
+class ProcessRecipeImageTests(TestCase):
+    """Test generating the variants of recipe images"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Pancakes',
+            time_minutes=10,
+            price=2.00
+        )
+
+    def tearDown(self):
+        self.recipe.refresh_from_db()
+        for formats in self.recipe.image_variants.values():
+            for name in formats.values():
+                default_storage.delete(name)
+        self.recipe.image.delete()
+
+    def attach_image(self, size=(40, 20)):
+        """Attach a JPEG image with EXIF metadata to the recipe"""
+        image = Image.new('RGB', size, color='red')
+        exif = image.getexif()
+        exif[0x010F] = 'Test camera'
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            image.save(ntf, format='JPEG', exif=exif.tobytes())
+            ntf.seek(0)
+            self.recipe.image.save('photo.jpg', File(ntf))
+
+    def test_variants_generated(self):
+        """Test each size is generated as JPEG and WebP"""
+        self.attach_image()
+
+        process_recipe_image(self.recipe.id)
+
+        self.recipe.refresh_from_db()
+        variants = self.recipe.image_variants
+        self.assertEqual(set(variants), {'16', '64'})
+        for formats in variants.values():
+            self.assertEqual(set(formats), {'jpg', 'webp'})
+        with default_storage.open(variants['16']['webp']) as file:
+            image = Image.open(file)
+            self.assertEqual(image.format, 'WEBP')
+            self.assertEqual(image.size, (16, 8))
+        with default_storage.open(variants['64']['jpg']) as file:
+            # Images are never enlarged
+            self.assertEqual(Image.open(file).size, (40, 20))
+
+    def test_metadata_stripped(self):
+        """Test the EXIF metadata is removed from the original"""
+        self.attach_image()
+
+        process_recipe_image(self.recipe.id)
+
+        self.recipe.refresh_from_db()
+        with Image.open(self.recipe.image.path) as image:
+            self.assertEqual(dict(image.getexif()), {})
+
+    def test_variants_exposed_as_urls(self):
+        """Test the recipe detail links to the variants"""
+        self.attach_image()
+        process_recipe_image(self.recipe.id)
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        res = client.get(
+            reverse('recipe:recipe-detail', args=[self.recipe.id])
+        )
+
+        url = res.data['image_variants']['16']['webp']
+        self.assertTrue(url.startswith('http://testserver/media/'))
+        self.assertTrue(url.endswith('_16.webp'))
+
+    def test_recipe_without_image(self):
+        """Test processing a recipe without an image does nothing"""
+        process_recipe_image(self.recipe.id)
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_variants, {})
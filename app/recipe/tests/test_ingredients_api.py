@@ -54,7 +54,7 @@ class TestPrivateIngredientAPI(TestCase):
         serializer = IngredientSerializer(ingredients, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         """Test ingredients only returned for authorized user"""
@@ -118,10 +118,11 @@ class TestPrivateIngredientAPI(TestCase):
                 'assigned_only': 1
             }
         )
+        ingredient1.refresh_from_db()
         serializer1 = IngredientSerializer(ingredient1)
         serializer2 = IngredientSerializer(ingredient2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertNotIn(serializer2.data, res.data['results'])
 
     def test_retrieve_ingredients_assigned_unique(self):
         """Test filtering ingredients by assigned returns unique items"""
@@ -148,4 +149,4 @@ class TestPrivateIngredientAPI(TestCase):
                 'assigned_only': 1
             }
         )
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
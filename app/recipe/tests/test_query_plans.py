@@ -0,0 +1,92 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient
+from recipe.benchmark import SEEDED_TABLES, seed
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAG_URL = reverse('recipe:tag-list')
+INGREDIENT_URL = reverse('recipe:ingredient-list')
+TAG_AUTOCOMPLETE_URL = reverse('recipe:tag-autocomplete')
+
+
+class QueryPlanTests(TestCase):
+    """Test the recipe endpoints use indexes on a large dataset"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = seed(users=50, rows_per_user=1000)[-1]
+        cls.tags = Tag.objects.filter(user=cls.user)
+        cls.ingredients = Ingredient.objects.filter(user=cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def assertNoSequentialScans(self, url, params=None):
+        """Explain every query an endpoint runs and fail on a seq scan"""
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                cursor.execute(f'EXPLAIN {query["sql"]}')
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+                for table in SEEDED_TABLES:
+                    self.assertNotIn(
+                        f'Seq Scan on {table} ',
+                        plan,
+                        f'{query["sql"]}\n{plan}'
+                    )
+
+    def test_list_recipes(self):
+        self.assertNoSequentialScans(RECIPES_URL)
+
+    def test_list_recipes_next_page(self):
+        res = self.client.get(RECIPES_URL, {'page_size': 10})
+        self.assertNoSequentialScans(res.data['next'])
+
+    def test_filter_recipes_by_tags(self):
+        ids = ','.join(str(tag.id) for tag in self.tags[:3])
+        self.assertNoSequentialScans(RECIPES_URL, {'tags': ids})
+
+    def test_filter_recipes_by_ingredients(self):
+        ids = ','.join(str(item.id) for item in self.ingredients[:3])
+        self.assertNoSequentialScans(RECIPES_URL, {'ingredients': ids})
+
+    def test_filter_recipes_by_time_ordered_by_price(self):
+        self.assertNoSequentialScans(
+            RECIPES_URL,
+            {'max_time': 30, 'ordering': '-price'}
+        )
+
+    def test_list_recipes_by_time_next_page(self):
+        res = self.client.get(
+            RECIPES_URL,
+            {'ordering': 'time_minutes', 'page_size': 10}
+        )
+        self.assertNoSequentialScans(res.data['next'])
+
+    def test_search_recipes(self):
+        self.assertNoSequentialScans(RECIPES_URL, {'search': 'recipe 42'})
+
+    def test_list_tags(self):
+        self.assertNoSequentialScans(TAG_URL)
+
+    def test_list_tags_assigned_only(self):
+        self.assertNoSequentialScans(TAG_URL, {'assigned_only': 1})
+
+    def test_autocomplete_tags(self):
+        self.assertNoSequentialScans(TAG_AUTOCOMPLETE_URL, {'q': 'tag 42'})
+
+    def test_list_ingredients(self):
+        self.assertNoSequentialScans(INGREDIENT_URL)
+
+    def test_list_ingredients_assigned_only(self):
+        self.assertNoSequentialScans(INGREDIENT_URL, {'assigned_only': 1})
@@ -1,15 +1,19 @@
 import tempfile
 import os
+from unittest.mock import patch
 
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import Recipe, Tag, Ingredient
+from recipe.pagination import RecipeCursorPagination
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
 RECIPES_URL = reverse('recipe:recipe-list')
@@ -89,7 +93,7 @@ class PrivateRecipeTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipes_limited_to_user(self):
         """Test retrieving recipes for user"""
@@ -104,8 +108,8 @@ class PrivateRecipeTests(TestCase):
         recipes = Recipe.objects.filter(user=self.user).order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_retrieve_recipe_detail(self):
         """Test retrieving the details of the recipe"""
@@ -222,9 +226,9 @@ class PrivateRecipeTests(TestCase):
         serializer1 = RecipeSerializer(recipe1)
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
 
     def test_filter_recipes_by_ingredients(self):
         """Test returning recipes with specific ingredients"""
@@ -245,9 +249,375 @@ class PrivateRecipeTests(TestCase):
         serializer1 = RecipeSerializer(recipe1)
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
+
+    def test_filter_recipes_returns_each_recipe_once(self):
+        """Test a recipe matching several filter IDs is only returned once"""
+        recipe = sample_recipe(user=self.user)
+        tag1 = sample_tag(user=self.user, name='Vegan')
+        tag2 = sample_tag(user=self.user, name='Vegetarian')
+        ingredient1 = sample_ingredient(user=self.user, name='Tofu')
+        ingredient2 = sample_ingredient(user=self.user, name='Rice')
+        recipe.tags.add(tag1, tag2)
+        recipe.ingredients.add(ingredient1, ingredient2)
+
+        res = self.client.get(
+            RECIPES_URL,
+            {
+                'tags': f'{tag1.id},{tag2.id}',
+                'ingredients': f'{ingredient1.id},{ingredient2.id}'
+            }
+        )
+
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['id'], recipe.id)
+
+    def test_create_recipe_ingredients_resolved_in_one_query(self):
+        """Test all submitted ingredients are looked up with one query"""
+        ingredients = [
+            sample_ingredient(user=self.user, name=f'Ingredient {i}')
+            for i in range(30)
+        ]
+        payload = {
+            'title': 'Everything soup',
+            'ingredients': [ingredient.id for ingredient in ingredients],
+            'tags': [],
+            'time_minutes': 60,
+            'price': 10.00
+        }
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        lookups = [
+            query for query in context.captured_queries
+            if 'WHERE ("core_ingredient"."user_id"' in query['sql']
+        ]
+        self.assertEqual(len(lookups), 1)
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.ingredients.count(), 30)
+
+    def test_create_recipe_missing_ids_reported_together(self):
+        """Test every unknown tag id is reported at once"""
+        tag = sample_tag(user=self.user)
+        payload = {
+            'title': 'Soup',
+            'tags': [tag.id, tag.id + 100, tag.id + 200],
+            'ingredients': [],
+            'time_minutes': 10,
+            'price': 5.00
+        }
+
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data['tags']), 2)
+        self.assertIn(str(tag.id + 100), res.data['tags'][0])
+        self.assertIn(str(tag.id + 200), res.data['tags'][1])
+
+    def test_create_recipe_other_users_tag_rejected(self):
+        """Test recipes cannot be linked to another user's tags"""
+        other = get_user_model().objects.create_user(
+            'other@email.com',
+            'password123'
+        )
+        tag = sample_tag(user=other)
+        payload = {
+            'title': 'Soup',
+            'tags': [tag.id],
+            'ingredients': [],
+            'time_minutes': 10,
+            'price': 5.00
+        }
+
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_create_recipe_invalid_id_type(self):
+        """Test non integer ids are rejected"""
+        payload = {
+            'title': 'Soup',
+            'tags': ['abc'],
+            'ingredients': [],
+            'time_minutes': 10,
+            'price': 5.00
+        }
+
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipeRangeFilterTests(TestCase):
+    """Test filtering and ordering recipes by time and price"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(user=self.user)
+        self.quick = sample_recipe(
+            user=self.user,
+            title='Toast',
+            time_minutes=5,
+            price=1.50
+        )
+        self.medium = sample_recipe(
+            user=self.user,
+            title='Omelette',
+            time_minutes=15,
+            price=4.00
+        )
+        self.slow = sample_recipe(
+            user=self.user,
+            title='Roast',
+            time_minutes=120,
+            price=25.00
+        )
+
+    def ids(self, params):
+        res = self.client.get(RECIPES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_filter_max_time(self):
+        """Test returning recipes which take at most max_time minutes"""
+        ids = self.ids({'max_time': 15})
+
+        self.assertEqual(ids, [self.medium.id, self.quick.id])
+
+    def test_filter_price_range(self):
+        """Test returning recipes within a price range"""
+        ids = self.ids({'min_price': '2.00', 'max_price': '25.00'})
+
+        self.assertEqual(ids, [self.slow.id, self.medium.id])
+
+    def test_ordering(self):
+        """Test ordering recipes by time and price, either way"""
+        self.assertEqual(
+            self.ids({'ordering': 'time_minutes'}),
+            [self.quick.id, self.medium.id, self.slow.id]
+        )
+        self.assertEqual(
+            self.ids({'ordering': '-price'}),
+            [self.slow.id, self.medium.id, self.quick.id]
+        )
+
+    def test_ordering_paginated(self):
+        """Test paging through ordered recipes with equal values returns
+        each recipe once, in order
+        """
+        tied = [
+            sample_recipe(user=self.user, time_minutes=15)
+            for _ in range(3)
+        ]
+        ids = []
+        url = f'{RECIPES_URL}?ordering=time_minutes&page_size=2'
+        while url:
+            res = self.client.get(url)
+            ids.extend(recipe['id'] for recipe in res.data['results'])
+            url = res.data['next']
+
+        expected = [self.quick.id, self.medium.id]
+        expected += [recipe.id for recipe in tied] + [self.slow.id]
+        self.assertEqual(ids, expected)
+
+    def test_invalid_params(self):
+        """Test invalid ranges and orderings are rejected"""
+        for params in (
+            {'max_time': 'soon'},
+            {'max_time': -1},
+            {'min_price': 'cheap'},
+            {'ordering': 'title'},
+        ):
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(
+                res.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                params
+            )
+            self.assertIn(next(iter(params)), res.data)
+
+
+class RecipeFieldsTests(TestCase):
+    """Test requesting sparse fieldsets and expanded recipe fields"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(user=self.user)
+        self.recipe = sample_recipe(user=self.user, title='Curry')
+        self.tag = sample_tag(user=self.user, name='Spicy')
+        self.recipe.tags.add(self.tag)
+        self.recipe.ingredients.add(sample_ingredient(user=self.user))
+
+    def test_list_sparse_fields(self):
+        """Test listing only the requested fields, in one query"""
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        self.assertEqual(
+            res.data['results'],
+            [{'id': self.recipe.id, 'title': 'Curry'}]
+        )
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('"price"', context.captured_queries[0]['sql'])
+
+    def test_list_sparse_fields_with_related(self):
+        """Test related fields are prefetched only when requested"""
+        with self.assertNumQueries(2):
+            res = self.client.get(RECIPES_URL, {'fields': 'id,tags'})
+
+        self.assertEqual(
+            res.data['results'],
+            [{'id': self.recipe.id, 'tags': [self.tag.id]}]
+        )
+
+    def test_sparse_fields_paginated_by_ordering_field(self):
+        """Test ordering by a field which is not returned"""
+        other = sample_recipe(user=self.user, title='Toast', price=1.00)
+        res = self.client.get(
+            RECIPES_URL,
+            {'fields': 'id', 'ordering': 'price', 'page_size': 1}
+        )
+        self.assertEqual(res.data['results'], [{'id': other.id}])
+
+        with self.assertNumQueries(1):
+            res = self.client.get(res.data['next'])
+
+        self.assertEqual(res.data['results'], [{'id': self.recipe.id}])
+
+    def test_list_expand_tags(self):
+        """Test nesting the tags of listed recipes"""
+        res = self.client.get(RECIPES_URL, {'expand': 'tags'})
+
+        recipe = res.data['results'][0]
+        self.assertEqual(
+            recipe['tags'],
+            [{'id': self.tag.id, 'name': 'Spicy', 'recipe_count': 1}]
+        )
+        self.assertEqual(recipe['ingredients'], [
+            ingredient.id for ingredient in self.recipe.ingredients.all()
+        ])
+
+    def test_retrieve_sparse_fields(self):
+        """Test retrieving only the requested fields of a recipe"""
+        res = self.client.get(
+            recipe_detail_url(self.recipe.id),
+            {'fields': 'title,tags'}
+        )
+
+        self.assertEqual(res.data, {
+            'title': 'Curry',
+            'tags': [
+                {'id': self.tag.id, 'name': 'Spicy', 'recipe_count': 1}
+            ],
+        })
+
+    def test_fields_ignored_when_writing(self):
+        """Test fields does not limit what updates return"""
+        res = self.client.patch(
+            f'{recipe_detail_url(self.recipe.id)}?fields=id',
+            {'title': 'Thai curry'}
+        )
+
+        self.assertEqual(res.data['title'], 'Thai curry')
+        self.assertIn('price', res.data)
+
+
+class RecipeQueryCountTests(TransactionTestCase):
+    """Test the recipe endpoints use a fixed number of queries"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(user=self.user)
+
+    def create_recipes(self, count):
+        """Create recipes that each have a couple of tags and ingredients"""
+        for i in range(count):
+            recipe = sample_recipe(user=self.user, title=f'Recipe {i}')
+            recipe.tags.add(
+                sample_tag(user=self.user, name=f'Tag {i}'),
+                sample_tag(user=self.user, name=f'Other tag {i}')
+            )
+            recipe.ingredients.add(
+                sample_ingredient(user=self.user, name=f'Ingredient {i}'),
+                sample_ingredient(user=self.user, name=f'Other {i}')
+            )
+
+    def test_list_query_count_is_constant(self):
+        """Test listing recipes, with their tag and ingredient ids, takes
+        a single query
+        """
+        self.create_recipes(1)
+        with self.assertNumQueries(1):
+            self.client.get(RECIPES_URL)
+
+        self.create_recipes(10)
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results'][0]['tags']), 2)
+
+    def test_retrieve_query_count(self):
+        """Test retrieving a recipe prefetches its tags and ingredients"""
+        self.create_recipes(1)
+        recipe = Recipe.objects.get(user=self.user)
+
+        # Plus one for Last-Modified
+        with self.assertNumQueries(4):
+            res = self.client.get(recipe_detail_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 2)
+        self.assertEqual(len(res.data['ingredients']), 2)
+
+
+class RecipePaginationTests(TestCase):
+    """Test cursor pagination of the recipe list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(user=self.user)
+        self.recipes = [
+            sample_recipe(user=self.user, title=f'Recipe {i}')
+            for i in range(5)
+        ]
+
+    def test_page_size_param(self):
+        """Test the client can choose the page size"""
+        res = self.client.get(RECIPES_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
+        self.assertIsNone(res.data['previous'])
+
+    @patch.object(RecipeCursorPagination, 'max_page_size', 3)
+    def test_page_size_capped(self):
+        """Test the page size cannot exceed the maximum"""
+        res = self.client.get(RECIPES_URL, {'page_size': 100})
+
+        self.assertEqual(len(res.data['results']), 3)
+
+    def test_follow_next_links(self):
+        """Test following next links returns every recipe once, in order"""
+        ids = []
+        url = f'{RECIPES_URL}?page_size=2'
+        while url:
+            res = self.client.get(url)
+            ids.extend(recipe['id'] for recipe in res.data['results'])
+            url = res.data['next']
+
+        expected = sorted((recipe.id for recipe in self.recipes), reverse=True)
+        self.assertEqual(ids, expected)
 
 
 class RecipeImageUploadTests(TestCase):
@@ -276,6 +646,19 @@ class RecipeImageUploadTests(TestCase):
             self.assertIn('image', res.data)
             self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    @patch('recipe.views.schedule_image_processing')
+    def test_upload_image_schedules_processing(self, schedule):
+        """Test uploading an image queues its processing and returns"""
+        url = recipe_image_upload_url(self.recipe.id)
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            Image.new('RGB', (10, 10)).save(ntf, format='JPEG')
+            ntf.seek(0)
+            res = self.client.post(url, {'image': ntf}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['image_variants'], {})
+        schedule.assert_called_once_with(self.recipe.id)
+
     def test_upload_image_bad_request(self):
         url = recipe_image_upload_url(self.recipe.id)
         res = self.client.post(url, {'image': 'notimage'}, format='multipart')
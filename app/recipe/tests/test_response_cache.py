@@ -0,0 +1,143 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Recipe
+from recipe.caching import get_version
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAG_URL = reverse('recipe:tag-list')
+
+
+def recipe_detail_url(recipe_id):
+    """Return recipe detail URL"""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class ResponseCacheTests(TransactionTestCase):
+    """Test caching of the recipe API responses"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Pancakes',
+            time_minutes=10,
+            price=2.00
+        )
+
+    def test_repeated_list_served_from_cache(self):
+        """Test listing again does not query the database"""
+        first = self.client.get(RECIPES_URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPES_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_query_params_cached_separately(self):
+        """Test different query strings get different responses"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        Tag.objects.create(user=self.user, name='Dessert')
+        self.client.get(TAG_URL)
+
+        res = self.client.get(TAG_URL, {'page_size': 1})
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'example.com'])
+    def test_hosts_cached_separately(self):
+        """Test requests to other hosts or schemes get their own links"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        Tag.objects.create(user=self.user, name='Dessert')
+        self.client.get(TAG_URL, {'page_size': 1})
+
+        res = self.client.get(
+            TAG_URL,
+            {'page_size': 1},
+            HTTP_HOST='example.com',
+            secure=True
+        )
+
+        self.assertTrue(res.data['next'].startswith('https://example.com/'))
+
+    def test_if_none_match_not_modified(self):
+        """Test a matching If-None-Match returns 304 without queries"""
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                recipe_detail_url(self.recipe.id),
+                HTTP_IF_NONE_MATCH=res['ETag']
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_write_invalidates_cache(self):
+        """Test saving recipe data changes the cached responses"""
+        res = self.client.get(RECIPES_URL)
+        etag = res['ETag']
+
+        self.recipe.title = 'Waffles'
+        self.recipe.save()
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.data['results'][0]['title'], 'Waffles')
+
+    def test_cache_invalidated_on_commit(self):
+        """Test a write invalidates the cached responses once it commits,
+        so responses built before then are not cached as current
+        """
+        version = get_version(self.user.pk)
+
+        with transaction.atomic():
+            self.recipe.title = 'Waffles'
+            self.recipe.save()
+            self.assertEqual(get_version(self.user.pk), version)
+
+        self.assertNotEqual(get_version(self.user.pk), version)
+
+    def test_m2m_change_invalidates_cache(self):
+        """Test linking a tag to a recipe changes the cached responses"""
+        self.client.get(recipe_detail_url(self.recipe.id))
+
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+
+        self.assertEqual(res.data['tags'][0]['name'], 'Vegan')
+
+    def test_delete_through_api_invalidates_cache(self):
+        """Test deleting a recipe removes it from the cached list"""
+        self.client.get(RECIPES_URL)
+
+        self.client.delete(recipe_detail_url(self.recipe.id))
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_cache_limited_to_user(self):
+        """Test users never see each other's cached responses"""
+        self.client.get(RECIPES_URL)
+        other = get_user_model().objects.create_user(
+            'other@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=other)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'], [])
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Tag, Ingredient, Recipe
+from recipe.rows import recipe_rows, serialize_recipe_rows
+from recipe.serializers import TagSerializer, IngredientSerializer, \
+    RecipeSerializer
+
+
+class RecipeRowsTests(TestCase):
+    """Test rows render exactly like the serializers"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('Vegan', 'Dessert', 'Quick')
+        ]
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ('Salt', 'Flour')
+        ]
+        plain = Recipe.objects.create(
+            user=self.user,
+            title='Plain',
+            time_minutes=1,
+            price=0
+        )
+        linked = Recipe.objects.create(
+            user=self.user,
+            title='Crêpes "au sucre"',
+            time_minutes=25,
+            price=5.5,
+            link='https://example.com/crêpes'
+        )
+        # Linked out of id order
+        linked.tags.add(tags[2], tags[0])
+        linked.ingredients.add(*reversed(ingredients))
+        self.recipes = Recipe.objects.filter(pk__in=[plain.pk, linked.pk])
+
+    def assertRendersEqual(self, serializer_data, rows_data):
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(serializer_data),
+            renderer.render(rows_data)
+        )
+
+    def test_recipe_rows_match_serializer(self):
+        """Test recipe rows render byte for byte like RecipeSerializer"""
+        recipes = self.recipes.order_by('id')
+        serializer = RecipeSerializer(recipes, many=True)
+
+        self.assertRendersEqual(
+            serializer.data,
+            serialize_recipe_rows(
+                recipe_rows(recipes),
+                RecipeSerializer().fields['price']
+            )
+        )
+
+    def test_tag_and_ingredient_rows_match_serializers(self):
+        """Test tag and ingredient rows render like their serializers"""
+        for model, serializer_class in (
+            (Tag, TagSerializer),
+            (Ingredient, IngredientSerializer),
+        ):
+            objects = model.objects.filter(user=self.user).order_by('-name')
+
+            self.assertRendersEqual(
+                serializer_class(objects, many=True).data,
+                list(objects.values('id', 'name', 'recipe_count'))
+            )
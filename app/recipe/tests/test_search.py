@@ -0,0 +1,187 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient, Recipe
+
+RECIPES_URL = reverse('recipe:recipe-list')
+RECIPES_BULK_URL = reverse('recipe:recipe-bulk')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def sample_recipe(user, title):
+    """Create and return a sample recipe"""
+    return Recipe.objects.create(
+        user=user,
+        title=title,
+        time_minutes=10,
+        price=5.00
+    )
+
+
+class RecipeSearchTests(TestCase):
+    """Test full-text search of recipes"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def search(self, text, **params):
+        res = self.client.get(RECIPES_URL, {'search': text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_search_title(self):
+        """Test searching matches stemmed words in recipe titles"""
+        recipe = sample_recipe(self.user, 'Baked potatoes')
+        sample_recipe(self.user, 'Fish and chips')
+
+        self.assertEqual(self.search('potato'), [recipe.id])
+
+    def test_search_tags_and_ingredients(self):
+        """Test searching matches the names of linked tags and ingredients"""
+        tagged = sample_recipe(self.user, 'Curry')
+        tagged.tags.add(Tag.objects.create(user=self.user, name='Spicy'))
+        with_ingredient = sample_recipe(self.user, 'Salad')
+        with_ingredient.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Cucumber')
+        )
+
+        self.assertEqual(self.search('spicy'), [tagged.id])
+        self.assertEqual(self.search('cucumber'), [with_ingredient.id])
+
+    def test_title_ranked_above_tags(self):
+        """Test matches in titles are ranked above matches in tags"""
+        title_match = sample_recipe(self.user, 'Vegan burger')
+        tag_match = sample_recipe(self.user, 'Lentil soup')
+        tag_match.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        # Newer recipes are listed first unless ranked lower
+        self.assertEqual(self.search('vegan'), [title_match.id, tag_match.id])
+
+    def test_search_limited_to_user(self):
+        """Test searching never returns other users' recipes"""
+        other = get_user_model().objects.create_user(
+            'other@email.com',
+            'Password1'
+        )
+        sample_recipe(other, 'Pancakes')
+
+        self.assertEqual(self.search('pancakes'), [])
+
+    def test_renamed_tag_updates_results(self):
+        """Test renaming a tag changes which recipes it finds"""
+        recipe = sample_recipe(self.user, 'Curry')
+        tag = Tag.objects.create(user=self.user, name='Spicy')
+        recipe.tags.add(tag)
+
+        tag.name = 'Mild'
+        tag.save()
+
+        self.assertEqual(self.search('spicy'), [])
+        self.assertEqual(self.search('mild'), [recipe.id])
+
+    def test_deleted_tag_updates_results(self):
+        """Test deleting or unlinking a tag removes its name from results"""
+        recipe = sample_recipe(self.user, 'Curry')
+        spicy = Tag.objects.create(user=self.user, name='Spicy')
+        indian = Tag.objects.create(user=self.user, name='Indian')
+        recipe.tags.add(spicy, indian)
+
+        spicy.delete()
+        indian.recipe_set.clear()
+
+        self.assertEqual(self.search('spicy'), [])
+        self.assertEqual(self.search('indian'), [])
+        self.assertEqual(self.search('curry'), [recipe.id])
+
+    def rebuilds(self, queries):
+        """Return the number of search vector rebuilds among queries"""
+        return sum(
+            query['sql'].startswith(
+                'UPDATE "core_recipe" SET "search_vector" ='
+            )
+            for query in queries.captured_queries
+        )
+
+    def test_created_recipe_rebuilt_once(self):
+        """Test creating a recipe with tags and ingredients rebuilds its
+        search vector once
+        """
+        tag = Tag.objects.create(user=self.user, name='Spicy')
+        ingredient = Ingredient.objects.create(user=self.user, name='Rice')
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(RECIPES_URL, {
+                'title': 'Curry',
+                'time_minutes': 30,
+                'price': 8.00,
+                'tags': [tag.id],
+                'ingredients': [ingredient.id],
+            }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.rebuilds(queries), 1)
+        self.assertEqual(self.search('spicy rice'), [res.data['id']])
+
+    def test_updated_recipe_rebuilt_once(self):
+        """Test updating a recipe and its links rebuilds its search vector
+        once
+        """
+        recipe = sample_recipe(self.user, 'Curry')
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Spicy'))
+        tag = Tag.objects.create(user=self.user, name='Mild')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(detail_url(recipe.id), {
+                'title': 'Korma',
+                'tags': [tag.id],
+            }, format='json')
+
+        self.assertEqual(self.rebuilds(queries), 1)
+        self.assertEqual(self.search('spicy'), [])
+        self.assertEqual(self.search('mild korma'), [recipe.id])
+
+    def test_bulk_created_recipes_searchable(self):
+        """Test recipes created in bulk can be searched"""
+        tag = Tag.objects.create(user=self.user, name='Breakfast')
+        res = self.client.post(RECIPES_BULK_URL, [
+            {
+                'title': 'Porridge',
+                'time_minutes': 10,
+                'price': 1.00,
+                'tags': [tag.id],
+                'ingredients': [],
+            },
+        ], format='json')
+
+        self.assertEqual(self.search('breakfast'), [res.data[0]['id']])
+
+    def test_search_paginated(self):
+        """Test paging through equally ranked results returns each once"""
+        recipes = [sample_recipe(self.user, 'Pancakes') for _ in range(5)]
+        ids = []
+        url = f'{RECIPES_URL}?search=pancakes&page_size=2'
+        while url:
+            res = self.client.get(url)
+            ids.extend(recipe['id'] for recipe in res.data['results'])
+            url = res.data['next']
+
+        self.assertEqual(ids, sorted(
+            (recipe.id for recipe in recipes),
+            reverse=True
+        ))
@@ -0,0 +1,214 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient, Recipe, Change
+from recipe.changes import read_changes
+
+SYNC_URL = reverse('recipe:sync-list')
+TAGS_BULK_URL = reverse('recipe:tag-bulk')
+
+
+class SyncTests(TransactionTestCase):
+    """Test the sync feed
+
+    Changes only appear once their transaction has committed, so these
+    tests cannot run inside one.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.salt = Ingredient.objects.create(user=self.user, name='Salt')
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Curry',
+            time_minutes=30,
+            price=8.00
+        )
+        self.recipe.tags.add(self.tag)
+
+    def sync(self, since=None):
+        res = self.client.get(SYNC_URL, {'since': since} if since else {})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_login_required(self):
+        """Test authentication is required to sync"""
+        res = APIClient().get(SYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_initial_sync(self):
+        """Test syncing without a token returns every object"""
+        data = self.sync()
+
+        self.assertFalse(data['more'])
+        self.assertEqual(data['recipes'], [{
+            'id': self.recipe.id,
+            'title': 'Curry',
+            'ingredients': [],
+            'tags': [self.tag.id],
+            'time_minutes': 30,
+            'price': '8.00',
+            'link': '',
+        }])
+        self.assertEqual(data['tags'], [
+            {'id': self.tag.id, 'name': 'Vegan', 'recipe_count': 1},
+        ])
+        self.assertEqual(data['ingredients'], [
+            {'id': self.salt.id, 'name': 'Salt', 'recipe_count': 0},
+        ])
+        self.assertEqual(
+            data['deleted'],
+            {'recipes': [], 'tags': [], 'ingredients': []}
+        )
+
+    def test_sync_without_changes(self):
+        """Test syncing again with no changes returns nothing"""
+        token = self.sync()['token']
+
+        data = self.sync(token)
+
+        self.assertEqual(data['token'], token)
+        self.assertEqual(data['recipes'], [])
+        self.assertEqual(data['tags'], [])
+
+    def test_sync_changes(self):
+        """Test syncing returns only the objects changed since the token"""
+        token = self.sync()['token']
+        other = Tag.objects.create(user=self.user, name='Spicy')
+        self.recipe.ingredients.add(self.salt)
+
+        data = self.sync(token)
+
+        self.assertEqual(data['tags'], [
+            {'id': other.id, 'name': 'Spicy', 'recipe_count': 0},
+        ])
+        self.assertEqual(data['ingredients'], [
+            {'id': self.salt.id, 'name': 'Salt', 'recipe_count': 1},
+        ])
+        self.assertEqual(data['recipes'][0]['ingredients'], [self.salt.id])
+
+    def test_sync_deletions(self):
+        """Test deleted objects are returned as tombstones, along with the
+        objects their deletion changed
+        """
+        token = self.sync()['token']
+        recipe_id = self.recipe.id
+
+        self.client.delete(
+            reverse('recipe:recipe-detail', args=[recipe_id])
+        )
+        data = self.sync(token)
+
+        self.assertEqual(data['deleted']['recipes'], [recipe_id])
+        self.assertEqual(data['tags'], [
+            {'id': self.tag.id, 'name': 'Vegan', 'recipe_count': 0},
+        ])
+
+    def test_sync_bulk_created(self):
+        """Test objects created in bulk are synced"""
+        token = self.sync()['token']
+
+        self.client.post(
+            TAGS_BULK_URL,
+            [{'name': 'Spicy'}, {'name': 'Quick'}],
+            format='json'
+        )
+        data = self.sync(token)
+
+        self.assertEqual(
+            [tag['name'] for tag in data['tags']],
+            ['Spicy', 'Quick']
+        )
+
+    def test_sync_bulk_deleted(self):
+        """Test objects deleted in bulk are returned as tombstones, along
+        with the recipes their deletion changed
+        """
+        other = Tag.objects.create(user=self.user, name='Spicy')
+        token = self.sync()['token']
+
+        self.client.delete(
+            TAGS_BULK_URL,
+            [self.tag.id, other.id],
+            format='json'
+        )
+        data = self.sync(token)
+
+        self.assertEqual(
+            data['deleted']['tags'],
+            sorted([self.tag.id, other.id])
+        )
+        self.assertEqual(data['recipes'][0]['tags'], [])
+
+    def test_delete_user(self):
+        """Test deleting a user deletes their objects and change log, and
+        records no changes for the deleted objects
+        """
+        self.recipe.ingredients.add(self.salt)
+
+        self.user.delete()
+
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(Tag.objects.exists())
+        self.assertFalse(Ingredient.objects.exists())
+        self.assertFalse(Change.objects.exists())
+
+    @override_settings(RECIPE_SYNC_BATCH_SIZE=2)
+    def test_sync_batches(self):
+        """Test changes are returned in batches until caught up"""
+        first = self.sync()
+        second = self.sync(first['token'])
+
+        self.assertTrue(first['more'])
+        self.assertFalse(second['more'])
+        synced = [
+            (name, obj['id'])
+            for data in (first, second)
+            for name in ('recipes', 'tags', 'ingredients')
+            for obj in data[name]
+        ]
+        self.assertCountEqual(synced, [
+            ('recipes', self.recipe.id),
+            ('tags', self.tag.id),
+            ('ingredients', self.salt.id),
+        ])
+
+    def test_sync_limited_to_user(self):
+        """Test other users' changes are not synced"""
+        token = self.sync()['token']
+        other_user = get_user_model().objects.create_user(
+            'other@email.com',
+            'Password1'
+        )
+        Tag.objects.create(user=other_user, name='Spicy')
+
+        data = self.sync(token)
+
+        self.assertEqual(data['tags'], [])
+
+    def test_running_transaction_not_synced(self):
+        """Test changes are not read before their transaction commits"""
+        with transaction.atomic():
+            Tag.objects.create(user=self.user, name='Spicy')
+
+            changes = list(read_changes(self.user, (0, 0), 10))
+
+        self.assertEqual(len(changes), 3)
+
+    def test_invalid_token(self):
+        """Test an invalid token is rejected"""
+        res = self.client.get(SYNC_URL, {'since': 'latest'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -51,7 +51,7 @@ class PrivateAPITagsTest(TestCase):
         tags = Tag.objects.all().order_by('-name')
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Test that tags returned belong to the authenticated user"""
@@ -64,8 +64,8 @@ class PrivateAPITagsTest(TestCase):
         res = self.client.get(TAG_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
 
     def test_create_tag_successful(self):
         """Test creating a tag works"""
@@ -107,10 +107,11 @@ class PrivateAPITagsTest(TestCase):
                 'assigned_only': 1
             }
         )
+        tag1.refresh_from_db()
         serializer1 = TagSerializer(tag1)
         serializer2 = TagSerializer(tag2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertNotIn(serializer2.data, res.data['results'])
 
     def test_retrieve_tags_filter_assigned_unique(self):
         """Test filtering tags by assigned returns unique items,
@@ -144,4 +145,21 @@ class PrivateAPITagsTest(TestCase):
                 'assigned_only': 1
             }
         )
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_tags_paginated_by_name(self):
+        """Test paging through tags with duplicate names returns each once"""
+        names = ['Vegan', 'Lunch', 'Lunch', 'Dessert', 'Lunch', 'Breakfast']
+        tags = [Tag.objects.create(user=self.user, name=n) for n in names]
+
+        ids = []
+        url = f'{TAG_URL}?page_size=2'
+        while url:
+            res = self.client.get(url)
+            self.assertLessEqual(len(res.data['results']), 2)
+            ids.extend(tag['id'] for tag in res.data['results'])
+            url = res.data['next']
+
+        expected = sorted(tags, key=lambda tag: tag.id)
+        expected = sorted(expected, key=lambda tag: tag.name, reverse=True)
+        self.assertEqual(ids, [tag.id for tag in expected])
@@ -0,0 +1,245 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient, Recipe
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+LAST_WEEK = timezone.now() - timedelta(days=7)
+
+
+def recipe_detail_url(recipe_id):
+    """Return recipe detail URL"""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class TimestampTests(TestCase):
+    """Test the created and updated times of recipes, tags and ingredients"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Curry',
+            time_minutes=30,
+            price=8.00
+        )
+        Recipe.objects.update(updated=LAST_WEEK)
+        Tag.objects.update(updated=LAST_WEEK)
+
+    def assertTouched(self, obj):
+        obj.refresh_from_db()
+        self.assertGreater(obj.updated, LAST_WEEK)
+
+    def test_timestamps_set_on_create(self):
+        """Test new objects record when they were created"""
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+
+        self.assertIsNotNone(ingredient.created)
+        self.assertLessEqual(ingredient.created, ingredient.updated)
+
+    def test_linking_touches_recipe_and_tag(self):
+        """Test linking a tag updates the recipe and the tag's count"""
+        self.recipe.tags.add(self.tag)
+
+        self.assertTouched(self.recipe)
+        self.assertTouched(self.tag)
+
+    def test_linking_from_tag_touches_recipe(self):
+        """Test linking a recipe to a tag updates the recipe"""
+        self.tag.recipe_set.add(self.recipe)
+
+        self.assertTouched(self.recipe)
+
+    def test_renaming_tag_touches_linked_recipes(self):
+        """Test renaming a tag updates the recipes using it"""
+        other = Recipe.objects.create(
+            user=self.user,
+            title='Soup',
+            time_minutes=5,
+            price=1.00
+        )
+        self.recipe.tags.add(self.tag)
+        Recipe.objects.update(updated=LAST_WEEK)
+
+        self.tag.name = 'Plant based'
+        self.tag.save()
+
+        self.assertTouched(self.recipe)
+        other.refresh_from_db()
+        self.assertEqual(other.updated, LAST_WEEK)
+
+    def test_deleting_tag_touches_linked_recipes(self):
+        """Test deleting a tag updates the recipes which used it"""
+        self.recipe.tags.add(self.tag)
+        Recipe.objects.update(updated=LAST_WEEK)
+
+        self.tag.delete()
+
+        self.assertTouched(self.recipe)
+
+
+class ConditionalGetTests(TransactionTestCase):
+    """Test Last-Modified and If-Modified-Since on the recipe API"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Curry',
+            time_minutes=30,
+            price=8.00
+        )
+        self.recipe.tags.add(self.tag)
+        Recipe.objects.update(updated=LAST_WEEK)
+        Tag.objects.update(updated=LAST_WEEK)
+
+    def test_retrieve_last_modified(self):
+        """Test a recipe's Last-Modified is when it last changed"""
+        res = self.client.get(recipe_detail_url(self.recipe.id))
+
+        self.assertEqual(res['Last-Modified'], http_date(
+            LAST_WEEK.timestamp()
+        ))
+
+    def test_retrieve_if_modified_since(self):
+        """Test a recipe unchanged since If-Modified-Since returns 304,
+        until one of its tags changes
+        """
+        url = recipe_detail_url(self.recipe.id)
+        last_modified = self.client.get(url)['Last-Modified']
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Counting another recipe touches the tag, but not this recipe
+        other = Recipe.objects.create(
+            user=self.user,
+            title='Soup',
+            time_minutes=5,
+            price=1.00
+        )
+        other.tags.add(self.tag)
+        Recipe.objects.filter(pk=self.recipe.pk).update(updated=LAST_WEEK)
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['tags'][0]['recipe_count'], 2)
+
+    def test_retrieve_missing_recipe(self):
+        """Test retrieving a missing recipe still returns 404"""
+        res = self.client.get(
+            recipe_detail_url(self.recipe.id + 1),
+            HTTP_IF_MODIFIED_SINCE=http_date()
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch('recipe.caching.time')
+    def test_list_if_modified_since(self, mock_time):
+        """Test a list unchanged since If-Modified-Since returns 304, until
+        one of the user's objects is deleted
+        """
+        mock_time.time.return_value = LAST_WEEK.timestamp()
+        Tag.objects.create(user=self.user, name='Dessert')
+        last_modified = self.client.get(TAGS_URL)['Last-Modified']
+
+        res = self.client.get(TAGS_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        mock_time.time.return_value = timezone.now().timestamp()
+        self.tag.delete()
+
+        res = self.client.get(TAGS_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+
+class ModifiedSinceTests(TestCase):
+    """Test filtering lists by the time objects last changed"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.old_recipe = Recipe.objects.create(
+            user=self.user,
+            title='Curry',
+            time_minutes=30,
+            price=8.00
+        )
+        Recipe.objects.update(updated=LAST_WEEK)
+        self.new_recipe = Recipe.objects.create(
+            user=self.user,
+            title='Soup',
+            time_minutes=5,
+            price=1.00
+        )
+        Ingredient.objects.create(user=self.user, name='Salt')
+        Ingredient.objects.update(updated=LAST_WEEK)
+        Ingredient.objects.create(user=self.user, name='Pepper')
+
+    def test_recipes_modified_since(self):
+        """Test only the recipes changed since the given time are listed"""
+        since = (LAST_WEEK + timedelta(days=1)).isoformat()
+
+        res = self.client.get(RECIPES_URL, {'modified_since': since})
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [self.new_recipe.id])
+
+    def test_modified_since_http_date(self):
+        """Test the time can be given in the format of Last-Modified"""
+        since = http_date(LAST_WEEK.timestamp())
+
+        res = self.client.get(INGREDIENTS_URL, {'modified_since': since})
+
+        names = {ingredient['name'] for ingredient in res.data['results']}
+        self.assertEqual(names, {'Salt', 'Pepper'})
+
+    def test_ingredients_modified_since(self):
+        """Test only the ingredients changed since the given time are
+        listed
+        """
+        since = timezone.now().replace(year=2020).isoformat()
+        Ingredient.objects.filter(name='Salt').update(
+            updated=timezone.now().replace(year=2019)
+        )
+
+        res = self.client.get(INGREDIENTS_URL, {'modified_since': since})
+
+        names = [ingredient['name'] for ingredient in res.data['results']]
+        self.assertEqual(names, ['Pepper'])
+
+    def test_invalid_modified_since(self):
+        """Test an invalid time is rejected"""
+        res = self.client.get(TAGS_URL, {'modified_since': 'yesterday'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
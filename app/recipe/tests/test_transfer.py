@@ -0,0 +1,256 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient, Recipe
+
+EXPORT_URL = reverse('recipe:recipe-export')
+IMPORT_URL = reverse('recipe:recipe-import')
+
+
+def sample_user(email='test@email.com', password='Password1'):
+    """Create sample user"""
+    return get_user_model().objects.create_user(email, password)
+
+
+def ndjson(items):
+    return ''.join(json.dumps(item) + '\n' for item in items)
+
+
+class PublicTransferApiTests(TestCase):
+    """Test unauthenticated import and export access"""
+
+    def test_auth_required(self):
+        res = APIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateTransferApiTests(TestCase):
+    """Test the streaming recipe export and import"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = sample_user()
+        self.client.force_authenticate(user=self.user)
+
+    def sample_recipe(self, title='Curry', tags=(), ingredients=()):
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title=title,
+            time_minutes=30,
+            price=8.00
+        )
+        for name in tags:
+            recipe.tags.add(Tag.objects.create(user=self.user, name=name))
+        for name in ingredients:
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=name)
+            )
+        return recipe
+
+    def export(self, **params):
+        res = self.client.get(EXPORT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return b''.join(res.streaming_content).decode()
+
+    def import_recipes(self, body, content_type='application/x-ndjson'):
+        return self.client.post(IMPORT_URL, body, content_type=content_type)
+
+    def test_export_ndjson(self):
+        """Test recipes are exported one per line, naming their tags and
+        ingredients
+        """
+        self.sample_recipe(tags=['Vegan', 'Spicy'], ingredients=['Rice'])
+
+        res = self.client.get(EXPORT_URL)
+        lines = b''.join(res.streaming_content).decode().splitlines()
+
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([json.loads(line) for line in lines], [{
+            'title': 'Curry',
+            'ingredients': ['Rice'],
+            'tags': ['Spicy', 'Vegan'],
+            'time_minutes': 30,
+            'price': '8.00',
+            'link': '',
+        }])
+
+    def test_export_csv(self):
+        """Test recipes are exported as CSV with ?format=csv"""
+        self.sample_recipe(tags=['Vegan', 'Spicy'])
+
+        content = self.export(format='csv')
+
+        self.assertEqual(content.splitlines(), [
+            'title,ingredients,tags,time_minutes,price,link',
+            'Curry,,Spicy;Vegan,30,8.00,',
+        ])
+
+    def test_export_empty_csv(self):
+        """Test exporting no recipes as CSV returns the header"""
+        content = self.export(format='csv')
+
+        self.assertEqual(
+            content,
+            'title,ingredients,tags,time_minutes,price,link\r\n'
+        )
+
+    def test_export_limited_to_user(self):
+        """Test only the user's recipes are exported, filtered as in the
+        list
+        """
+        self.sample_recipe(title='Curry', tags=['Vegan'])
+        self.sample_recipe(title='Stew')
+        Recipe.objects.create(
+            user=sample_user('other@email.com'),
+            title='Soup',
+            time_minutes=10,
+            price=2.00
+        )
+        tag = Tag.objects.get(name='Vegan')
+
+        content = self.export(tags=tag.id)
+
+        self.assertEqual(
+            [json.loads(line)['title'] for line in content.splitlines()],
+            ['Curry']
+        )
+
+    def test_export_queries_constant(self):
+        """Test the number of queries does not grow with the recipes"""
+        self.sample_recipe(tags=['Vegan'], ingredients=['Rice'])
+        with CaptureQueriesContext(connection) as few:
+            self.export()
+        for i in range(10):
+            self.sample_recipe(
+                title=f'Recipe {i}',
+                tags=[f'Tag {i}'],
+                ingredients=[f'Ingredient {i}']
+            )
+
+        with CaptureQueriesContext(connection) as many:
+            self.export()
+
+        self.assertEqual(len(many), len(few))
+
+    def test_import_ndjson(self):
+        """Test importing recipes, reusing tags with the same name and
+        creating the others
+        """
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        body = ndjson([
+            {
+                'title': 'Curry',
+                'tags': ['Vegan', 'Spicy'],
+                'ingredients': ['Rice'],
+                'time_minutes': 30,
+                'price': '8.00',
+            },
+            {'title': 'Stew', 'tags': ['Vegan'], 'time_minutes': 60,
+             'price': '5.50', 'link': 'https://example.com/stew'},
+        ])
+
+        res = self.import_recipes(body)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data, {'created': 2})
+        curry = Recipe.objects.get(user=self.user, title='Curry')
+        self.assertEqual(
+            sorted(curry.tags.values_list('name', flat=True)),
+            ['Spicy', 'Vegan']
+        )
+        self.assertEqual(
+            list(curry.ingredients.values_list('name', flat=True)),
+            ['Rice']
+        )
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        vegan.refresh_from_db()
+        self.assertEqual(vegan.recipe_count, 2)
+        self.assertTrue(
+            Recipe.objects.filter(search_vector='spicy').exists()
+        )
+
+    def test_import_csv(self):
+        """Test importing recipes from CSV, with semicolon separated tags"""
+        body = (
+            'title,ingredients,tags,time_minutes,price,link\r\n'
+            'Curry,Rice,Vegan;Spicy,30,8.00,\r\n'
+        )
+
+        res = self.import_recipes(body, 'text/csv')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.title, 'Curry')
+        self.assertEqual(recipe.tags.count(), 2)
+
+    @override_settings(RECIPE_TRANSFER_BATCH_SIZE=2)
+    def test_import_batches(self):
+        """Test importing more recipes than fit in one batch, with tags
+        shared between batches
+        """
+        body = ndjson([
+            {'title': f'Recipe {i}', 'tags': ['Vegan'], 'time_minutes': i,
+             'price': '1.00'}
+            for i in range(5)
+        ])
+
+        res = self.import_recipes(body)
+
+        self.assertEqual(res.data, {'created': 5})
+        self.assertEqual(Tag.objects.get(user=self.user).recipe_count, 5)
+
+    def test_export_import_round_trip(self):
+        """Test an export imports as identical recipes for another user"""
+        self.sample_recipe(tags=['Vegan'], ingredients=['Rice', 'Salt'])
+        content = self.export()
+        self.client.force_authenticate(user=sample_user('other@email.com'))
+
+        self.import_recipes(content)
+
+        self.assertEqual(self.export(), content)
+
+    @override_settings(RECIPE_TRANSFER_BATCH_SIZE=2)
+    def test_import_invalid_item(self):
+        """Test an invalid item is reported and nothing is imported"""
+        body = ndjson([
+            {'title': 'Curry', 'time_minutes': 30, 'price': '8.00'},
+            {'title': 'Stew', 'time_minutes': 60, 'price': '5.50'},
+            {'title': 'Soup', 'time_minutes': 'long', 'price': '2.00'},
+        ])
+
+        res = self.import_recipes(body)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('time_minutes', res.data['item 3'])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_import_invalid_json(self):
+        """Test a malformed line is reported"""
+        res = self.import_recipes('{"title": "Curry"\n')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_invalid_encoding(self):
+        """Test a body which is not valid UTF-8 is reported"""
+        for content_type in ('application/x-ndjson', 'text/csv'):
+            res = self.import_recipes(b'{"title": "Cr\xe8me"}\n', content_type)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_unsupported_media_type(self):
+        """Test importing a JSON document is rejected"""
+        res = self.client.post(IMPORT_URL, [], format='json')
+
+        self.assertEqual(
+            res.status_code,
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
@@ -0,0 +1,140 @@
+import io
+import os
+from unittest.mock import patch
+
+from PIL import Image
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from recipe.uploads import ImageUploadHandler, is_image_header, \
+    upload_temp_dir
+
+
+def recipe_image_upload_url(recipe_id):
+    """Return url for recipe image upload"""
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def sample_image(image_format='JPEG', size=(10, 10)):
+    """Return the bytes of an image in image_format"""
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+class ImageHeaderTests(TestCase):
+    """Test recognising image headers"""
+
+    def test_image_formats_accepted(self):
+        """Test JPEG, PNG, GIF and WebP headers are recognised"""
+        for image_format in ('JPEG', 'PNG', 'GIF', 'WEBP'):
+            self.assertTrue(is_image_header(sample_image(image_format)))
+
+    def test_other_data_rejected(self):
+        """Test data which is not an image is rejected"""
+        self.assertFalse(is_image_header(b'<html></html>'))
+        self.assertFalse(is_image_header(b'RIFF\x00\x00\x00\x00WAVEfmt '))
+
+
+@patch('recipe.views.schedule_image_processing')
+class ImageUploadHandlerTests(TestCase):
+    """Test streaming recipe image uploads to disk"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@email.com',
+            'Password1'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Pancakes',
+            time_minutes=10,
+            price=2.00
+        )
+        self.url = recipe_image_upload_url(self.recipe.id)
+
+    def tearDown(self):
+        self.recipe.refresh_from_db()
+        self.recipe.image.delete()
+
+    def upload(self, content, name='photo.jpg'):
+        image = SimpleUploadedFile(name, content, content_type='image/jpeg')
+        return self.client.post(self.url, {'image': image})
+
+    def test_upload_moved_from_temp_dir(self, schedule):
+        """Test the upload is moved into place, leaving no temporary file"""
+        temp_files = set(os.listdir(upload_temp_dir()))
+
+        res = self.upload(sample_image())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertTrue(self.recipe.image.path.startswith(
+            os.path.join(settings.MEDIA_ROOT, 'uploads/recipe/')
+        ))
+        self.assertTrue(os.path.exists(self.recipe.image.path))
+        self.assertEqual(set(os.listdir(upload_temp_dir())), temp_files)
+
+    def test_upload_not_held_in_memory(self, schedule):
+        """Test uploads are streamed to a temporary file"""
+        with patch.object(
+            ImageUploadHandler,
+            'file_complete',
+            autospec=True,
+            side_effect=ImageUploadHandler.file_complete
+        ) as file_complete:
+            self.upload(sample_image())
+
+        handler = file_complete.call_args[0][0]
+        self.assertTrue(handler.file.temporary_file_path().startswith(
+            upload_temp_dir()
+        ))
+
+    def test_non_image_rejected(self, schedule):
+        """Test files which do not start with an image header fail"""
+        res = self.upload(b'#!/bin/sh\n' * 100, name='script.jpg')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', res.data)
+        schedule.assert_not_called()
+
+    @override_settings(RECIPE_IMAGE_MAX_BYTES=1024)
+    def test_large_upload_rejected(self, schedule):
+        """Test uploads over the size limit fail with 413"""
+        temp_files = set(os.listdir(upload_temp_dir()))
+        content = sample_image() + b'\x00' * 2048
+
+        # The body is within the declared length allowance, so the limit is
+        # enforced while streaming
+        res = self.upload(content)
+
+        self.assertEqual(
+            res.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+        self.assertEqual(set(os.listdir(upload_temp_dir())), temp_files)
+
+    @override_settings(RECIPE_IMAGE_MAX_BYTES=1024)
+    def test_declared_length_rejected_early(self, schedule):
+        """Test requests declaring a body over the limit are rejected
+        before any of the file is written
+        """
+        with patch.object(ImageUploadHandler, 'new_file') as new_file:
+            res = self.upload(sample_image() + b'\x00' * 128 * 1024)
+
+        self.assertEqual(
+            res.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        new_file.assert_not_called()
@@ -0,0 +1,159 @@
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.db import transaction
+from django.db.models import CharField, OuterRef
+from rest_framework.exceptions import ValidationError
+
+from core.models import Recipe
+from recipe.caching import bump_version
+from recipe.changes import record_changes
+from recipe.counters import RECIPE_FIELDS, update_recipe_counts
+from recipe.rows import ArraySubquery
+from recipe.search import update_search_vectors
+from recipe.serializers import RecipeTransferSerializer
+
+
+def linked_names(field_name):
+    """Return an array of the names of the objects linked to the outer
+    recipe through one of its M2M fields, in name order
+    """
+    field = Recipe._meta.get_field(field_name)
+    column = f'{field.m2m_reverse_field_name()}__name'
+    links = field.remote_field.through.objects.filter(recipe=OuterRef('pk'))
+    return ArraySubquery(
+        links.order_by(column).values(column),
+        output_field=ArrayField(CharField())
+    )
+
+
+def export_rows(queryset):
+    """Yield the representation RecipeTransferSerializer gives each recipe
+    of a queryset, reading them from the database in batches with their
+    tag and ingredient names
+    """
+    price = RecipeTransferSerializer().fields['price'].to_representation
+    rows = queryset.prefetch_related(None).values(
+        'title',
+        'time_minutes',
+        'price',
+        'link',
+        ingredient_names=linked_names('ingredients'),
+        tag_names=linked_names('tags')
+    )
+    for row in rows.iterator(chunk_size=settings.RECIPE_TRANSFER_BATCH_SIZE):
+        yield {
+            'title': row['title'],
+            'ingredients': row['ingredient_names'],
+            'tags': row['tag_names'],
+            'time_minutes': row['time_minutes'],
+            'price': price(row['price']),
+            'link': row['link'],
+        }
+
+
+def _batches(items, size):
+    """Yield lists of up to size items from an iterable"""
+    items = iter(items)
+    batch = list(islice(items, size))
+    while batch:
+        yield batch
+        batch = list(islice(items, size))
+
+
+def _resolve_names(user, model, names, ids):
+    """Add the ids of the user's objects of model with the given names to
+    ids, a dict by name, creating the objects which do not exist
+    """
+    missing = names - ids.keys()
+    if not missing:
+        return
+    # The oldest of several objects with the same name is used
+    ids.update(model.objects.filter(
+        user=user,
+        name__in=missing
+    ).order_by('-id').values_list('name', 'id'))
+    created = model.objects.bulk_create(
+        model(user=user, name=name) for name in missing - ids.keys()
+    )
+    ids.update((obj.name, obj.id) for obj in created)
+    # Bulk inserts do not send the signals which record changes
+    record_changes(model.objects.filter(pk__in=[obj.id for obj in created]))
+
+
+def _create_recipes(user, validated_data, name_ids, linked_ids):
+    """Insert a batch of validated recipes, linking them to their tags and
+    ingredients by name
+    """
+    names = {
+        model: [attrs.pop(field, []) for attrs in validated_data]
+        for model, field in RECIPE_FIELDS.items()
+    }
+    recipes = Recipe.objects.bulk_create(
+        Recipe(user=user, **attrs) for attrs in validated_data
+    )
+
+    for model, field_name in RECIPE_FIELDS.items():
+        _resolve_names(
+            user,
+            model,
+            {name for item in names[model] for name in item},
+            name_ids[model]
+        )
+        ids = name_ids[model]
+        field = Recipe._meta.get_field(field_name)
+        through = field.remote_field.through
+        through.objects.bulk_create(
+            through(recipe_id=recipe.id, **{
+                field.m2m_reverse_name(): ids[name]
+            })
+            for recipe, item in zip(recipes, names[model])
+            for name in dict.fromkeys(item)
+        )
+        linked_ids[model].update(
+            ids[name] for item in names[model] for name in item
+        )
+
+    # Bulk inserts do not send the signals which maintain search vectors
+    # and record changes
+    created = Recipe.objects.filter(pk__in=[recipe.id for recipe in recipes])
+    update_search_vectors(created)
+    record_changes(created)
+
+
+def import_recipes(user, items):
+    """Create recipes for a user from an iterable of items in the form
+    RecipeTransferSerializer accepts, validating and inserting them in
+    batches, and return the number created
+
+    Tags and ingredients are matched to the user's by name, and created
+    if missing. Everything is imported in one transaction, so an invalid
+    item leaves nothing imported.
+    """
+    name_ids = {model: {} for model in RECIPE_FIELDS}
+    linked_ids = {model: set() for model in RECIPE_FIELDS}
+    count = 0
+    with transaction.atomic():
+        for batch in _batches(items, settings.RECIPE_TRANSFER_BATCH_SIZE):
+            serializer = RecipeTransferSerializer(data=batch, many=True)
+            if not serializer.is_valid():
+                raise ValidationError({
+                    f'item {count + index}': errors
+                    for index, errors in enumerate(serializer.errors, 1)
+                    if errors
+                })
+            _create_recipes(
+                user,
+                serializer.validated_data,
+                name_ids,
+                linked_ids
+            )
+            count += len(batch)
+        # Counted once at the end, rather than for every batch
+        for model, ids in linked_ids.items():
+            update_recipe_counts(model.objects.filter(pk__in=ids))
+
+    if count:
+        bump_version(user.pk)
+    return count
@@ -0,0 +1,103 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+# Leading bytes of the image formats accepted for upload
+IMAGE_SIGNATURES = (
+    b'\xff\xd8\xff',
+    b'\x89PNG\r\n\x1a\n',
+    b'GIF87a',
+    b'GIF89a',
+)
+
+# Room left for the multipart boundaries and form fields around the image
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Uploaded file is too large.'
+    default_code = 'upload_too_large'
+
+
+def upload_temp_dir():
+    """Return the directory uploads are streamed to, creating it if needed"""
+    path = os.path.join(settings.MEDIA_ROOT, 'tmp')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def is_image_header(data):
+    """Return whether data starts like a JPEG, PNG, GIF or WebP image"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return True
+    return data.startswith(IMAGE_SIGNATURES)
+
+
+class MediaTemporaryUploadedFile(TemporaryUploadedFile):
+    """Uploaded file kept in a temporary file on the media volume
+
+    Storing it next to its final location lets FileSystemStorage move it
+    into place with a rename instead of copying it.
+    """
+
+    def __init__(self, name, content_type, size, charset,
+                 content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(
+            suffix='.upload' + ext,
+            dir=upload_temp_dir()
+        )
+        super(TemporaryUploadedFile, self).__init__(
+            file, name, content_type, size, charset, content_type_extra
+        )
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Stream uploaded images straight to disk
+
+    Chunks are written to a temporary file as they arrive, so memory use
+    does not grow with the size of the upload. Uploads over
+    RECIPE_IMAGE_MAX_BYTES are rejected as soon as that many bytes have been
+    received, and files which do not start with an image header are
+    rejected after the first chunk.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        """Reject requests declaring a body too large to hold the image"""
+        max_bytes = settings.RECIPE_IMAGE_MAX_BYTES + MULTIPART_OVERHEAD
+        if content_length > max_bytes:
+            raise UploadTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = MediaTemporaryUploadedFile(
+            self.file_name,
+            self.content_type,
+            0,
+            self.charset,
+            self.content_type_extra
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and not is_image_header(raw_data):
+            self.file.close()
+            raise ValidationError({self.field_name: [
+                'Upload a valid image. The file you uploaded was either not '
+                'an image or a corrupted image.'
+            ]})
+        if start + len(raw_data) > settings.RECIPE_IMAGE_MAX_BYTES:
+            self.file.close()
+            raise UploadTooLarge()
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        return self.file
@@ -8,6 +8,8 @@ router = DefaultRouter()
 router.register('tags', views.TagViewSet)
 router.register('ingredients', views.IngredientViewSet)
 router.register('recipes', views.RecipeViewSet)
+router.register('stats', views.RecipeStatsViewSet, base_name='stats')
+router.register('sync', views.SyncViewSet, base_name='sync')
 
 app_name = 'recipe'
 
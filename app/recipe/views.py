@@ -1,57 +1,173 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Avg, Count, FloatField, IntegerField, Max, \
+    Min, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.http import StreamingHttpResponse
 from rest_framework.decorators import action
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
 from rest_framework.response import Response
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from core.models import Tag, Ingredient, Recipe
-from recipe import serializers
+from core.parsers import CSVParser, NDJSONParser
+from core.renderers import CSVRenderer, NDJSONRenderer
+from recipe import serializers, transfer
+from recipe.autocomplete import autocomplete, autocomplete_cache
+from recipe.bulk import BulkModelMixin
+from recipe.caching import CachedResponseMixin, get_version
+from recipe.changes import SYNCED_MODELS, format_token, parse_token, \
+    read_changes
+from recipe.rows import RowsListMixin, recipe_rows, serialize_recipe_rows
+from recipe.images import schedule_image_processing
+from recipe.pagination import RecipeAttrCursorPagination, \
+    RecipeCursorPagination
+from recipe.search import search_recipes
 from recipe.serializers import IngredientSerializer, RecipeSerializer
+from recipe.uploads import ImageUploadHandler
+from user.authentication import CachedTokenAuthentication
+
+
+def recipe_links(field_name, **filters):
+    """Return the rows of a recipe M2M through table, e.g. recipe_links(
+    'tags', tag_id__in=[1, 2]), for use in semi-join subqueries
+    """
+    return getattr(Recipe, field_name).through.objects.filter(**filters)
+
+
+def latest_update(field_name):
+    """Return a subquery of the latest time an object linked to the outer
+    recipe through one of its M2M fields was updated
+    """
+    model = Recipe._meta.get_field(field_name).related_model
+    return Subquery(
+        model.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by('-updated').values('updated')[:1]
+    )
 
 
 class BaseRecipeAttrViewSet(
+    CachedResponseMixin,
+    RowsListMixin,
+    BulkModelMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin
 ):
     """Base view set for user recipe attributes"""
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = RecipeAttrCursorPagination
+    # Name of the Recipe M2M field that links to this model
+    recipe_field = None
 
     def get_queryset(self):
-        assigned_only = bool(
-            int(self.request.query_params.get('assigned_only', 0))
-        )
-        queryset = self.queryset
-        if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
-        return queryset.filter(
-            user=self.request.user
-        ).order_by('-name').distinct()
+        queryset = self.queryset.filter(user=self.request.user)
+        filters = self._get_filters()
+        if 'modified_since' in filters:
+            queryset = queryset.filter(
+                updated__gte=filters['modified_since']
+            )
+        if self._get_assigned_only():
+            # Postgres runs the IN subquery as a semi-join, which stops at
+            # the first linked recipe, so there are no duplicate rows to
+            # sort and remove with DISTINCT
+            column = Recipe._meta.get_field(
+                self.recipe_field
+            ).m2m_reverse_name()
+            links = recipe_links(self.recipe_field).values(column)
+            queryset = queryset.filter(pk__in=links)
+        return queryset.order_by('-name')
+
+    def _get_assigned_only(self):
+        """Return whether only objects assigned to recipes are requested"""
+        return bool(int(self.request.query_params.get('assigned_only', 0)))
+
+    def _get_filters(self):
+        """Return the validated modified_since query parameter"""
+        if not hasattr(self, '_filters'):
+            serializer = serializers.ModifiedSinceSerializer(
+                data=self.request.query_params
+            )
+            serializer.is_valid(raise_exception=True)
+            self._filters = serializer.validated_data
+        return self._filters
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def get_list_rows(self, queryset):
+        """Return the rows of the listed objects, which are exactly the
+        fields of their serializers
+        """
+        return queryset.values('id', 'name', 'recipe_count')
+
+    def _get_limit(self):
+        """Return the number of autocomplete matches requested"""
+        options = settings.RECIPE_AUTOCOMPLETE
+        try:
+            limit = int(self.request.query_params.get(
+                'limit',
+                options['LIMIT']
+            ))
+        except ValueError:
+            raise ValidationError({'limit': ['A valid integer is required.']})
+        return max(1, min(limit, options['MAX_LIMIT']))
+
+    @action(methods=['GET'], detail=False)
+    def autocomplete(self, request):
+        """Return the objects whose names best match ?q=, for type-ahead"""
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response([])
+        limit = self._get_limit()
+
+        # Keyed by the user's data version, so changes are seen immediately,
+        # and by every filter get_queryset() applies
+        key = (
+            self.queryset.model._meta.label,
+            request.user.pk,
+            get_version(request.user.pk),
+            self._get_assigned_only(),
+            self._get_filters().get('modified_since'),
+            text.lower(),
+            limit,
+        )
+        data = autocomplete_cache.get(key)
+        if data is None:
+            matches = autocomplete(self.get_queryset(), text, limit)
+            data = self.get_serializer(matches, many=True).data
+            autocomplete_cache.set(key, data)
+        return Response(data)
+
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """Manage tags in the database"""
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    recipe_field = 'tags'
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Manage ingredient model in the database"""
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
+    recipe_field = 'ingredients'
 
 
 class RecipeViewSet(
+    CachedResponseMixin,
+    RowsListMixin,
+    BulkModelMixin,
     viewsets.ModelViewSet
 ):
     """Manage recipes in the database"""
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = RecipeCursorPagination
 
     def _params_to_ints(self, qs):
         """Convert a list of string IDs to a list of integers
@@ -65,13 +181,167 @@ class RecipeViewSet(
         tags = self.request.query_params.get('tags')
         ingredients = self.request.query_params.get('ingredients')
         queryset = self.queryset
+        # Filter with semi-joins rather than joins, so a recipe matching
+        # several of the given IDs is still only returned once
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            links = recipe_links('tags', tag_id__in=tag_ids)
+            queryset = queryset.filter(pk__in=links.values('recipe_id'))
         if ingredients:
             ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
-        return queryset.filter(user=self.request.user)
+            links = recipe_links(
+                'ingredients',
+                ingredient_id__in=ingredient_ids
+            )
+            queryset = queryset.filter(pk__in=links.values('recipe_id'))
+        queryset = queryset.filter(user=self.request.user)
+        filters = self._get_filters()
+        if 'max_time' in filters:
+            queryset = queryset.filter(time_minutes__lte=filters['max_time'])
+        if 'min_price' in filters:
+            queryset = queryset.filter(price__gte=filters['min_price'])
+        if 'max_price' in filters:
+            queryset = queryset.filter(price__lte=filters['max_price'])
+        if 'modified_since' in filters:
+            # Inclusive, as Last-Modified is truncated to the second
+            queryset = queryset.filter(
+                updated__gte=filters['modified_since']
+            )
+        search = self.request.query_params.get('search')
+        if search:
+            queryset = search_recipes(queryset, search)
+        queryset = self._prefetch_related(queryset)
+        return queryset.order_by(*self.get_ordering())
+
+    def _get_filters(self):
+        """Return the validated range and ordering query parameters"""
+        if not hasattr(self, '_filters'):
+            serializer = serializers.RecipeFilterSerializer(
+                data=self.request.query_params
+            )
+            serializer.is_valid(raise_exception=True)
+            self._filters = serializer.validated_data
+        return self._filters
+
+    def get_ordering(self):
+        """Return the ordering of the recipes: by the ?ordering= field,
+        best matches first when searching, or newest first
+        """
+        ordering = self._get_filters().get('ordering')
+        if ordering:
+            # Break ties by id in the same direction, so an index on
+            # (user, field, id) can be scanned either way
+            return (ordering, '-id' if ordering.startswith('-') else 'id')
+        if self.request.query_params.get('search'):
+            return ('-rank', '-id')
+        return ('-id',)
+
+    def get_last_modified(self):
+        """Return when the requested recipe, its tags or its ingredients
+        last changed
+        """
+        if self.action != 'retrieve':
+            return super().get_last_modified()
+        try:
+            updated = Recipe.objects.filter(
+                user=self.request.user,
+                pk=self.kwargs['pk']
+            ).annotate(
+                last_updated=Greatest(
+                    'updated',
+                    latest_update('tags'),
+                    latest_update('ingredients')
+                )
+            ).values_list('last_updated', flat=True).first()
+        except (TypeError, ValueError):
+            return None
+        return updated.timestamp() if updated is not None else None
+
+    def _get_names_param(self, name):
+        """Return the set of comma separated names in a query parameter,
+        or None if it is not given
+        """
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return {item.strip() for item in value.split(',') if item.strip()}
+
+    def _get_fields(self):
+        """Return the names of the fields requested with ?fields=, or None
+        for every field
+        """
+        if self.action not in ('list', 'retrieve'):
+            return None
+        return self._get_names_param('fields')
+
+    def _get_expand(self):
+        """Return the names of the related fields requested nested with
+        ?expand=
+        """
+        if self.action not in ('list', 'retrieve'):
+            return set()
+        return self._get_names_param('expand') or set()
+
+    def _prefetch_related(self, queryset):
+        """Load only the columns and related objects serialized by the
+        current action, so tags and ingredients cost one query each
+        regardless of how many recipes are returned
+        """
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+
+        fields = self._get_fields()
+        if fields is not None:
+            # Pagination reads the ordering fields from each recipe
+            ordering = [
+                name.lstrip('-') for name in self.get_ordering()
+                if name.lstrip('-') != 'rank'
+            ]
+            columns = [
+                field.name for field in Recipe._meta.concrete_fields
+                if field.name in fields
+            ]
+            queryset = queryset.only('id', *columns, *ordering)
+
+        prefetches = []
+        for name, model in (('tags', Tag), ('ingredients', Ingredient)):
+            if fields is not None and name not in fields:
+                continue
+            if self.action == 'list' and name not in self._get_expand():
+                # Unless expanded, the list only renders the primary keys
+                related = model.objects.only('id')
+            else:
+                related = model.objects.only('id', 'name', 'recipe_count')
+            prefetches.append(
+                Prefetch(name, queryset=related.order_by('id'))
+            )
+        return queryset.prefetch_related(*prefetches)
+
+    def get_list_rows(self, queryset):
+        """Return the rows of the listed recipes, unless the request asks
+        for particular fields
+        """
+        if self._get_fields() is not None or self._get_expand():
+            return None
+        # Cursor pagination reads the position from the first ordering field
+        extra_fields = [
+            name for name in ('rank',)
+            if name in queryset.query.annotations
+        ]
+        return recipe_rows(queryset, *extra_fields)
+
+    def serialize_rows(self, rows):
+        return serialize_recipe_rows(
+            rows,
+            self.get_serializer().fields['price']
+        )
+
+    def get_serializer_context(self):
+        """Add the fields and expansions requested to the context"""
+        context = super().get_serializer_context()
+        context['fields'] = self._get_fields()
+        context['expand'] = self._get_expand()
+        return context
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""
@@ -90,12 +360,17 @@ class RecipeViewSet(
     def upload_image(self, request, pk=None):
         """Upload an image to a recipe"""
         recipe = self.get_object()
+        # Must be set before request.data is first read
+        request.upload_handlers = [ImageUploadHandler(request)]
         serializer = self.get_serializer(
             recipe,
             data=request.data
         )
         if serializer.is_valid():
-            serializer.save()
+            # Variants of the previous image no longer apply; the new ones
+            # are generated in the background
+            serializer.save(image_variants={})
+            schedule_image_processing(recipe.id)
             return Response(
                 serializer.data,
                 status=status.HTTP_200_OK
@@ -105,3 +380,179 @@ class RecipeViewSet(
             serializer.errors,
             status=status.HTTP_400_BAD_REQUEST
         )
+
+    @action(
+        methods=['GET'],
+        detail=False,
+        renderer_classes=(NDJSONRenderer, CSVRenderer)
+    )
+    def export(self, request):
+        """Stream the recipes, filtered as in the list, as NDJSON or CSV
+        with their tags and ingredients by name
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        # The rows are read once the response is returned, after the
+        # request's database routing has ended
+        queryset = queryset.using(queryset.db)
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f'; charset={renderer.charset}'
+        response = StreamingHttpResponse(
+            renderer.render_rows(
+                transfer.export_rows(queryset),
+                serializers.RecipeTransferSerializer.Meta.fields
+            ),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="recipes.{renderer.format}"'
+        )
+        return response
+
+    @action(
+        methods=['POST'],
+        detail=False,
+        url_path='import',
+        url_name='import',
+        parser_classes=(NDJSONParser, CSVParser)
+    )
+    def import_recipes(self, request):
+        """Create recipes from NDJSON or CSV in the form they are exported
+        in, reading the request body line by line
+        """
+        parser = request.negotiator.select_parser(
+            request,
+            self.get_parsers()
+        )
+        if parser is None:
+            raise UnsupportedMediaType(request.content_type)
+        items = parser.parse_rows(
+            request.stream,
+            request.content_type,
+            request.parser_context
+        )
+        created = transfer.import_recipes(request.user, items)
+        return Response(
+            {'created': created},
+            status=status.HTTP_201_CREATED
+        )
+
+
+def user_aggregate(queryset, aggregate, output_field):
+    """Return a subquery of an aggregate over the outer user's objects"""
+    values = queryset.filter(
+        user=OuterRef('pk')
+    ).order_by().values('user').annotate(value=aggregate).values('value')
+    return Subquery(values, output_field=output_field)
+
+
+class RecipeStatsViewSet(CachedResponseMixin, viewsets.GenericViewSet):
+    """Summarize the recipes of the authenticated user"""
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    serializer_class = serializers.RecipeStatsSerializer
+    pagination_class = None
+
+    def get_stats(self):
+        """Return the aggregates of the user's recipes, tags and
+        ingredients, computed by index scans in a single query
+        """
+        recipes = Recipe.objects.all()
+        price = Recipe._meta.get_field('price')
+        return get_user_model().objects.filter(
+            pk=self.request.user.pk
+        ).annotate(
+            recipe_count=Coalesce(
+                user_aggregate(recipes, Count('*'), IntegerField()),
+                0
+            ),
+            tag_count=Coalesce(
+                user_aggregate(Tag.objects.all(), Count('*'), IntegerField()),
+                0
+            ),
+            ingredient_count=Coalesce(
+                user_aggregate(
+                    Ingredient.objects.all(),
+                    Count('*'),
+                    IntegerField()
+                ),
+                0
+            ),
+            average_time_minutes=user_aggregate(
+                recipes,
+                Avg('time_minutes'),
+                FloatField()
+            ),
+            min_price=user_aggregate(recipes, Min('price'), price),
+            max_price=user_aggregate(recipes, Max('price'), price),
+        ).values(*self.get_serializer().fields).get()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(self._list, request, *args, **kwargs)
+
+    def _list(self, request, *args, **kwargs):
+        return Response(self.get_serializer(self.get_stats()).data)
+
+
+class SyncViewSet(viewsets.GenericViewSet):
+    """Feed of the changes to the authenticated user's recipes, tags and
+    ingredients, for clients keeping an offline copy
+    """
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    pagination_class = None
+
+    def _get_since(self):
+        """Return the position of the ?since= token, or the start of the
+        change log
+        """
+        token = self.request.query_params.get('since')
+        if not token:
+            return (0, 0)
+        try:
+            return parse_token(token)
+        except ValueError:
+            raise ValidationError({'since': ['Invalid sync token.']})
+
+    def _get_rows(self, model, objects):
+        """Return the representation of changed objects, as listed"""
+        if model is Recipe:
+            return serialize_recipe_rows(
+                recipe_rows(objects),
+                RecipeSerializer().fields['price']
+            )
+        return list(objects.values('id', 'name', 'recipe_count'))
+
+    def list(self, request, *args, **kwargs):
+        """Return the latest state of the objects changed after ?since=,
+        the ids of those deleted, and the token to pass next time. Clients
+        request again while more is true.
+        """
+        since = self._get_since()
+        limit = settings.RECIPE_SYNC_BATCH_SIZE
+        changes = list(read_changes(request.user, since, limit + 1))
+        more = len(changes) > limit
+        changes = changes[:limit]
+
+        changed = {name: set() for name in SYNCED_MODELS}
+        for name, object_id, _, _ in changes:
+            changed[name].add(object_id)
+
+        data = {
+            'token': format_token(*changes[-1][2:]) if changes
+            else format_token(*since),
+            'more': more,
+        }
+        deleted = {}
+        for name, model in SYNCED_MODELS.items():
+            rows = self._get_rows(model, model.objects.filter(
+                user=request.user,
+                pk__in=changed[name]
+            ).order_by('id'))
+            data[f'{name}s'] = rows
+            deleted[f'{name}s'] = sorted(
+                changed[name] - {row['id'] for row in rows}
+            )
+        data['deleted'] = deleted
+        return Response(data)
@@ -0,0 +1,122 @@
+import copy
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+from core.cache import LRUCache
+
+token_cache = LRUCache(
+    max_size=settings.TOKEN_AUTH_CACHE['MAX_SIZE'],
+    ttl=settings.TOKEN_AUTH_CACHE['TTL']
+)
+
+
+def _shared_cache():
+    """Return the Django cache used as the shared tier, if configured"""
+    alias = settings.TOKEN_AUTH_CACHE['CACHE_ALIAS']
+    return caches[alias] if alias else None
+
+
+def _cache_key(key):
+    """Return the cache key for a token, without exposing the token"""
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def _generation_key(key):
+    """Return the cache key of a token's generation, which changes each
+    time the token is invalidated
+    """
+    return 'auth-token-generation:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def token_generation(key):
+    """Return the current generation of a token in the shared cache, or
+    None without one
+    """
+    shared = _shared_cache()
+    return shared.get(_generation_key(key)) if shared is not None else None
+
+
+def get_cached_token(key):
+    """Return the cached token for key, with its user, or None
+
+    With a shared cache, cached tokens are only used while their
+    generation is current, so invalidations made by any process are seen
+    on the next request.
+    """
+    shared = _shared_cache()
+    entry = token_cache.get(key)
+    if shared is None:
+        return entry[0] if entry is not None else None
+
+    values = shared.get_many(
+        [_generation_key(key)] + ([_cache_key(key)] if entry is None else [])
+    )
+    generation = values.get(_generation_key(key))
+    if entry is None:
+        entry = values.get(_cache_key(key))
+        if entry is None:
+            return None
+        token_cache.set(key, entry)
+
+    token, cached_generation = entry
+    if cached_generation != generation:
+        token_cache.delete(key)
+        return None
+    return token
+
+
+def cache_token(token, generation=None):
+    """Cache a token, with its user, in every configured tier, as of the
+    generation read before it was loaded
+    """
+    entry = (token, generation)
+    token_cache.set(token.key, entry)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.set(
+            _cache_key(token.key),
+            entry,
+            settings.TOKEN_AUTH_CACHE['TTL']
+        )
+
+
+def invalidate_token(key):
+    """Remove a token from every configured tier, and make other processes
+    drop their in-process copies
+    """
+    token_cache.delete(key)
+    shared = _shared_cache()
+    if shared is not None:
+        # Kept until evicted, as copies cached before may outlive any TTL
+        shared.set(_generation_key(key), uuid.uuid4().hex, None)
+        shared.delete(_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches tokens and their users, so most
+    requests authenticate without querying the database
+
+    Tokens are cached in process and, when TOKEN_AUTH_CACHE['CACHE_ALIAS']
+    is set, in that Django cache, and are invalidated by the signals in
+    user.signals when the token is deleted or its user is saved. With a
+    shared cache, every process sees invalidations on its next request;
+    without one, other processes keep their in-process entries for up to
+    TOKEN_AUTH_CACHE['TTL'] seconds.
+    """
+
+    def authenticate_credentials(self, key):
+        token = get_cached_token(key)
+        if token is None:
+            # Read first, so an invalidation during the lookup is not lost
+            generation = token_generation(key)
+            user, token = super().authenticate_credentials(key)
+            cache_token(token, generation)
+
+        # Hand each request its own copy, so changes made while handling
+        # one request are never seen by another
+        token = copy.deepcopy(token)
+        return (token.user, token)
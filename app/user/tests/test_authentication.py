@@ -0,0 +1,138 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from user.authentication import CachedTokenAuthentication, token_cache
+
+ME_URL = reverse('user:me')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating with cached tokens"""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@email.com',
+            password='Password1',
+            name='Test'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_authentication_is_cached(self):
+        """Test only the first authentication queries the database"""
+        auth = CachedTokenAuthentication()
+        with self.assertNumQueries(1):
+            user, token = auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = auth.authenticate_credentials(self.token.key)
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_each_request_gets_own_user(self):
+        """Test changes to one request's user are not shared"""
+        auth = CachedTokenAuthentication()
+        user1, token = auth.authenticate_credentials(self.token.key)
+        user1.name = 'Changed'
+        user2, token = auth.authenticate_credentials(self.token.key)
+
+        self.assertEqual(user2.name, 'Test')
+
+    def test_invalid_token(self):
+        """Test an unknown token is rejected and not cached"""
+        with self.assertRaises(AuthenticationFailed):
+            CachedTokenAuthentication().authenticate_credentials('invalid')
+        self.assertEqual(len(token_cache), 0)
+
+    def test_deleted_token_rejected(self):
+        """Test a cached token stops working once deleted"""
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test a cached token stops working once its user is deactivated"""
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_updated_user_not_stale(self):
+        """Test a cached token returns the user's latest details"""
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {'name': 'New name'})
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data['name'], 'New name')
+
+    @override_settings(TOKEN_AUTH_CACHE={
+        'MAX_SIZE': 10,
+        'TTL': 60,
+        'CACHE_ALIAS': 'default',
+    })
+    def test_shared_cache_tier(self):
+        """Test tokens are shared with other processes via the cache"""
+        caches['default'].clear()
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        # Simulate another process with an empty in-process cache
+        token_cache.clear()
+
+        with self.assertNumQueries(0):
+            user, token = auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+
+        key = self.token.key
+        self.token.delete()
+        token_cache.clear()
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate_credentials(key)
+
+    @override_settings(TOKEN_AUTH_CACHE={
+        'MAX_SIZE': 10,
+        'TTL': 60,
+        'CACHE_ALIAS': 'default',
+    })
+    def test_shared_cache_invalidates_other_processes(self):
+        """Test tokens cached in another process stop working once deleted
+        or their user is deactivated
+        """
+        caches['default'].clear()
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        # The copy another process cached, which this one's signals
+        # cannot reach
+        entry = token_cache.get(self.token.key)
+
+        self.user.is_active = False
+        self.user.save()
+        token_cache.set(self.token.key, entry)
+
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate_credentials(self.token.key)
+
+        self.user.is_active = True
+        self.user.save()
+        auth.authenticate_credentials(self.token.key)
+        entry = token_cache.get(self.token.key)
+        key = self.token.key
+        self.token.delete()
+        token_cache.set(key, entry)
+
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate_credentials(key)
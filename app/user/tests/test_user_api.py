@@ -1,5 +1,10 @@
-from django.test import TestCase
+import importlib.util
+from unittest import skipUnless
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -19,6 +24,8 @@ class PublicUserAPITests(TestCase):
 
     def setUp(self) -> None:
         self.client = APIClient()
+        # Throttle counts are kept in the cache
+        cache.clear()
 
     def test_create_user_valid_success(self):
         """Test creating user with valid payload success"""
@@ -88,6 +95,37 @@ class PublicUserAPITests(TestCase):
         self.assertNotIn('token', res.data)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_token_throttled(self):
+        """Test repeated login attempts from one client are throttled"""
+        payload = {'email': 'test@email.com', 'password': 'wrongpassword'}
+        for _ in range(10):
+            self.client.post(TOKEN_URL, payload)
+
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @skipUnless(importlib.util.find_spec('argon2'), 'argon2-cffi required')
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    ])
+    def test_create_token_upgrades_password_hash(self):
+        """Test logging in rehashes the password with the preferred hasher"""
+        user = create_user(email='test@email.com', password='testpass')
+        user.password = make_password('testpass', hasher='pbkdf2_sha256')
+        user.save()
+
+        res = self.client.post(
+            TOKEN_URL,
+            {'email': 'test@email.com', 'password': 'testpass'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('argon2$'))
+        self.assertTrue(user.check_password('testpass'))
+
     def test_retrieve_user_unauthorized(self):
         """Test that authentication is required for users"""
         res = self.client.get(ME_URL)
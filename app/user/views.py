@@ -1,24 +1,30 @@
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
+from .authentication import CachedTokenAuthentication
 from .serializers import UserSerializer, AuthTokenSerializer
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
 
 
 class CreateUserView(generics.CreateAPIView):
     """Create user"""
     serializer_class = UserSerializer
+    throttle_classes = (ScopedRateThrottle,)
+    throttle_scope = 'signup'
 
 
 class CreateTokenView(ObtainAuthToken):
     """Create new auth token for user"""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = (ScopedRateThrottle,)
+    throttle_scope = 'login'
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):